@@ -4,19 +4,118 @@ CroweLogic-Pharma API Server with NeuroDebian Integration
 Combines pharmaceutical research with neuroscience analysis tools
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from pathlib import Path
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-import requests
+import asyncio
+import os
+import sys
+import time
 import uvicorn
 import logging
 
+# Shared Ollama client layer lives at the repository root (copied next to
+# this file in the container image)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crowelogic_ollama import (
+    INTERACTIVE, PRIORITIES, BackendPool, BalancedOllamaClient, HealthMonitor, OllamaError,
+    PrometheusMiddleware, RequestScheduler, ResponseCache, SchedulerRejected, ServingMetrics,
+    SingleFlight, StreamTiming, WarmPoolManager, parse_keep_alive, sse_event, timed_stream
+)
+from crowelogic_ollama.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+# Ollama configuration (OLLAMA_BACKENDS lists several hosts, see
+# crowelogic_ollama.BackendPool.from_spec; OLLAMA_URL is the single-host default)
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+MODEL_NAME = "CroweLogic-Pharma:120b-v2"
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "8"))  # per backend
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "10"))
+
+# Model residency: keep MODEL_NAME loaded (-1 = until unloaded), pre-warm it
+# at startup and re-warm it every OLLAMA_WARM_INTERVAL seconds if evicted
+OLLAMA_KEEP_ALIVE = parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE", "-1"))
+OLLAMA_PREWARM = os.getenv("OLLAMA_PREWARM", "1").lower() not in ("0", "false", "no")
+OLLAMA_WARM_INTERVAL = float(os.getenv("OLLAMA_WARM_INTERVAL", "60"))
+
+# Response cache configuration (OLLAMA_CACHE_PATH enables the disk tier)
+OLLAMA_CACHE_SIZE = int(os.getenv("OLLAMA_CACHE_SIZE", "512"))
+OLLAMA_CACHE_TTL = float(os.getenv("OLLAMA_CACHE_TTL", "3600"))
+OLLAMA_CACHE_PATH = os.getenv("OLLAMA_CACHE_PATH")
+
+# Admission control: queued requests beyond OLLAMA_MAX_QUEUE get 429, and
+# requests that would wait longer than OLLAMA_MAX_WAIT seconds get 503
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "64"))
+OLLAMA_MAX_WAIT = float(os.getenv("OLLAMA_MAX_WAIT", "30"))
+
+# Health-checked backends and a pooled client that routes across them
+# (least outstanding requests, circuit breakers, model-aware)
+backend_pool = BackendPool.from_env(
+    OLLAMA_URL,
+    max_in_flight=OLLAMA_MAX_CONCURRENCY,
+    health_interval=OLLAMA_HEALTH_INTERVAL
+)
+ollama_client = BalancedOllamaClient(backend_pool, timeout=OLLAMA_TIMEOUT,
+                                     keep_alive=OLLAMA_KEEP_ALIVE)
+
+# Polls the backends in the background; /health answers from its snapshot
+health_monitor = HealthMonitor(backend_pool, models=[MODEL_NAME])
+
+# Pins and pre-warms the model on every backend that serves it
+warm_pool = WarmPoolManager(
+    ollama_client, [MODEL_NAME],
+    keep_alive=OLLAMA_KEEP_ALIVE,
+    refresh_interval=OLLAMA_WARM_INTERVAL
+)
+
+# Completed low-temperature generations, keyed on model + prompt + options
+response_cache = ResponseCache(
+    max_entries=OLLAMA_CACHE_SIZE,
+    ttl=OLLAMA_CACHE_TTL,
+    path=OLLAMA_CACHE_PATH
+)
+
+# Concurrent identical generations share one upstream request
+inflight = SingleFlight()
+
+# Bounded, prioritized queue in front of the backend
+scheduler = RequestScheduler(
+    max_in_flight=backend_pool.total_capacity(),
+    max_queue=OLLAMA_MAX_QUEUE,
+    max_wait=OLLAMA_MAX_WAIT,
+    name="ollama"
+)
+
+# Prometheus metrics (GET /metrics): HTTP and upstream latency, TTFT,
+# tokens/sec, cache hit rates, queue depth and backend health
+metrics = ServingMetrics()
+metrics.track_scheduler(scheduler)
+metrics.track_cache(response_cache)
+metrics.track_coalescing(inflight)
+metrics.track_backends(backend_pool)
+metrics.track_warm_pool(warm_pool)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await health_monitor.start()
+    # Warm in the background: loading a 120b model can outlast startup probes
+    warming = asyncio.create_task(warm_pool.run()) if OLLAMA_PREWARM else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    await health_monitor.stop()
+    await ollama_client.aclose()
+
 # Initialize FastAPI
 app = FastAPI(
     title="CroweLogic-Pharma NeuroDebian API",
     description="Pharmaceutical AI with integrated neuroscience research tools",
-    version="2.0-neurodebian"
+    version="2.0-neurodebian",
+    lifespan=lifespan
 )
 
 # CORS
@@ -27,15 +126,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware, metrics=metrics)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ollama configuration
-OLLAMA_URL = "http://localhost:11434"
-MODEL_NAME = "CroweLogic-Pharma:120b-v2"
-
 # Request models
 class NeuropharmacologyQuery(BaseModel):
     compound: str = Field(..., description="Mushroom compound (e.g., hericenone_a)")
@@ -48,25 +144,254 @@ class ClinicalTrialNeuroimaging(BaseModel):
     imaging_modalities: Optional[List[str]] = Field(None, description="MRI, fMRI, PET, EEG")
 
 # Helper function
-def query_ollama(prompt: str, temperature: float = 0.05) -> dict:
-    """Query Ollama model"""
+async def query_ollama(prompt: str, temperature: float = 0.05,
+                       response: Optional[Response] = None,
+                       priority: str = INTERACTIVE) -> dict:
+    """
+    Query Ollama model without blocking the event loop
+
+    Deterministic (low-temperature) prompts are answered from the response
+    cache when possible, and concurrent identical prompts share a single
+    upstream generation. Generations go through the scheduler; refused
+    requests raise 429/503 with a Retry-After header. The outcome is
+    reported in the X-Cache header (HIT, MISS or BYPASS) and X-Coalesced
+    when a response object is given.
+    """
+    options = {"temperature": temperature}
+    cacheable = response_cache.cacheable(options)
+    key = response_cache.prompt_key(MODEL_NAME, prompt, options)
+
+    if cacheable:
+        cached = await response_cache.aget(key)
+        if cached is not None:
+            _set_headers(response, {"X-Cache": "HIT"})
+            return cached
+
+    async def generate():
+        enqueued = time.perf_counter()
+
+        async def dispatch():
+            started = time.perf_counter()
+            metrics.queue_wait.observe(started - enqueued, priority=priority)
+            try:
+                result = await ollama_client.generate(MODEL_NAME, prompt, options=options)
+            except OllamaError:
+                metrics.observe_error(MODEL_NAME, "generate")
+                raise
+            metrics.observe_generation(MODEL_NAME, "generate", time.perf_counter() - started, result)
+            return result
+
+        result = await scheduler.submit(dispatch, priority)
+        if cacheable:
+            await response_cache.aset(key, result)
+        return result
+
     try:
-        response = requests.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": MODEL_NAME,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": temperature}
-            },
-            timeout=120
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        if cacheable:
+            result, shared = await inflight.do(key, generate)
+        else:
+            result, shared = await generate(), False
+    except SchedulerRejected as e:
+        raise _busy(e)
+    except OllamaError as e:
         logger.error(f"Ollama request failed: {e}")
         raise HTTPException(status_code=503, detail=f"Model service unavailable: {str(e)}")
 
+    _set_headers(response, {
+        "X-Cache": "MISS" if cacheable else "BYPASS",
+        "X-Coalesced": "true" if shared else "false"
+    })
+    return result
+
+def _busy(rejection: SchedulerRejected) -> HTTPException:
+    logger.warning(f"Request rejected: {rejection.reason}")
+    return HTTPException(
+        status_code=rejection.status_code,
+        detail=f"Model service busy: {rejection.reason}",
+        headers=rejection.headers
+    )
+
+def _priority(x_priority: Optional[str]) -> str:
+    """Priority class from the X-Priority header (interactive by default)"""
+    priority = (x_priority or INTERACTIVE).strip().lower()
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"X-Priority must be one of {list(PRIORITIES)}")
+    return priority
+
+def _set_headers(response: Optional[Response], headers: dict):
+    if response is not None:
+        response.headers.update(headers)
+
+async def _prepend(first: dict, rest):
+    yield first
+    async for chunk in rest:
+        yield chunk
+
+async def _cache_stream(key: str, chunks):
+    """Pass a token stream through, storing the completed generation"""
+    text = []
+    async for chunk in chunks:
+        if chunk.get("response"):
+            text.append(chunk["response"])
+        if chunk.get("done"):
+            await response_cache.aset(key, {**chunk, "response": "".join(text)})
+        yield chunk
+
+async def stream_ollama(prompt: str, metadata: dict, temperature: float = 0.05,
+                        priority: str = INTERACTIVE) -> StreamingResponse:
+    """
+    Relay Ollama's token stream as Server-Sent Events
+
+    Events:
+    - token: {"token": "..."} for every generated chunk
+    - done: metadata plus latency metrics (first_token_ms, total_ms, tokens/sec)
+    - error: {"detail": "..."} if the backend fails mid-stream
+
+    The first chunk is awaited before the response starts, so an unreachable
+    backend still returns a plain 503. Cached generations are replayed as a
+    single token event; completed streams are written back to the cache.
+    Concurrent identical streams share one upstream generation, and clients
+    that join late are replayed the tokens produced so far.
+    """
+    options = {"temperature": temperature}
+    cacheable = response_cache.cacheable(options)
+    key = response_cache.prompt_key(MODEL_NAME, prompt, options)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    cached = await response_cache.aget(key) if cacheable else None
+    if cached is not None:
+        timing = StreamTiming()
+
+        async def replay():
+            yield sse_event({"token": cached.get("response", "")}, "token")
+            timing.first_token = timing.end = time.perf_counter()
+            timing.tokens = 1
+            yield sse_event({**metadata, "metrics": {**timing.as_dict(), "cached": True}}, "done")
+
+        return StreamingResponse(replay(), media_type="text/event-stream",
+                                 headers={**headers, "X-Cache": "HIT"})
+
+    async def upstream():
+        enqueued = time.perf_counter()
+        async with scheduler.slot(priority):
+            upstream_timing = StreamTiming()
+            metrics.queue_wait.observe(upstream_timing.start - enqueued, priority=priority)
+            final = None
+            try:
+                async for chunk in timed_stream(
+                        ollama_client.stream_generate(MODEL_NAME, prompt, options=options),
+                        upstream_timing):
+                    if chunk.get("done"):
+                        final = chunk
+                    yield chunk
+            except OllamaError:
+                metrics.observe_error(MODEL_NAME, "stream")
+                raise
+            first_token_ms = upstream_timing.first_token_ms
+            metrics.observe_generation(
+                MODEL_NAME, "stream", upstream_timing.total_ms / 1000, final,
+                first_token_seconds=first_token_ms / 1000 if first_token_ms is not None else None
+            )
+
+    if cacheable:
+        source, shared = inflight.stream(key, lambda: _cache_stream(key, upstream()))
+    else:
+        source, shared = upstream(), False
+
+    timing = StreamTiming()
+    chunks = timed_stream(source, timing)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except SchedulerRejected as e:
+        raise _busy(e)
+    except OllamaError as e:
+        logger.error(f"Ollama stream failed: {e}")
+        raise HTTPException(status_code=503, detail=f"Model service unavailable: {str(e)}")
+
+    async def events():
+        try:
+            if first is not None:
+                async for chunk in _prepend(first, chunks):
+                    if chunk.get("response"):
+                        yield sse_event({"token": chunk["response"]}, "token")
+        except OllamaError as e:
+            logger.error(f"Ollama stream failed: {e}")
+            yield sse_event({"detail": f"Model service unavailable: {str(e)}"}, "error")
+            return
+        finally:
+            await chunks.aclose()
+
+        stream_timing = timing.as_dict()
+        logger.info(f"Stream complete: first token {stream_timing['first_token_ms']} ms, "
+                    f"total {stream_timing['total_ms']} ms, {stream_timing['tokens']} chunks")
+        yield sse_event({**metadata, "metrics": {**stream_timing, "coalesced": shared}}, "done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            **headers,
+            "X-Cache": "MISS" if cacheable else "BYPASS",
+            "X-Coalesced": "true" if shared else "false"
+        }
+    )
+
+# Prompt builders (shared by the blocking and streaming endpoints)
+def neuropharmacology_prompt(request: NeuropharmacologyQuery) -> str:
+    prompt = f"""Analyze the neuropharmacology of {request.compound} for {request.analysis_type}.
+
+Provide:
+1. Neurological mechanism of action
+2. Target brain regions and neurotransmitter systems
+3. Expected neuroimaging biomarkers
+4. Clinical assessment recommendations
+"""
+
+    if request.include_imaging:
+        prompt += """
+5. Recommended neuroimaging protocols:
+   - MRI sequences for structural changes
+   - fMRI paradigms for functional connectivity
+   - PET tracers for molecular imaging
+   - EEG/MEG for electrophysiological assessment
+"""
+    return prompt
+
+def neuroimaging_tools(request: NeuropharmacologyQuery) -> dict:
+    return {
+        "available": request.include_imaging,
+        "fsl_installed": False,  # Check actual installation
+        "afni_installed": False,
+        "python_tools": ["nibabel", "nilearn", "mne"]
+    }
+
+def clinical_trial_neuroimaging_prompt(request: ClinicalTrialNeuroimaging) -> str:
+    modalities = request.imaging_modalities or ["MRI", "fMRI", "PET"]
+
+    return f"""Design a comprehensive neuroimaging protocol for a clinical trial evaluating {request.compound} in {request.indication}.
+
+Include protocols for: {', '.join(modalities)}
+
+Provide:
+1. Imaging timepoints (baseline, follow-up schedule)
+2. MRI sequences and parameters
+3. fMRI task paradigms
+4. PET tracer selection
+5. Image processing pipeline recommendations
+6. Statistical analysis plan for imaging biomarkers
+7. NeuroDebian tools that can be used for analysis
+
+Focus on biomarkers relevant to {request.indication} pathophysiology."""
+
+RECOMMENDED_IMAGING_TOOLS = {
+    "preprocessing": "FSL FEAT, AFNI 3dDeconvolve",
+    "connectivity": "Nilearn, FSL MELODIC",
+    "structural": "FSL FIRST, ANTs",
+    "visualization": "FSLeyes, AFNI viewer"
+}
+
 # Standard endpoints (from original)
 @app.get("/")
 async def root():
@@ -91,106 +416,128 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check():
-    try:
-        response = requests.get(f"{OLLAMA_URL}/api/tags", timeout=5)
-        response.raise_for_status()
-        return {
-            "status": "healthy",
-            "model": MODEL_NAME,
-            "neurodebian": "active",
-            "neuroscience_tools": "available"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=str(e))
+async def health_check(http_response: Response):
+    """
+    Backend and model availability from the background health monitor
+
+    Answered from memory (no upstream request); "age_seconds" is the time
+    since the last poll and "stale" flags a monitor that has fallen behind.
+    """
+    health = health_monitor.snapshot()
+    if not health["healthy"]:
+        http_response.status_code = 503
+    return {
+        **health,
+        "model": MODEL_NAME,
+        "neurodebian": "active",
+        "neuroscience_tools": "available"
+    }
+
+@app.get("/api/stats")
+async def serving_stats():
+    """Scheduler queue depth and wait times, cache and coalescing statistics"""
+    return {
+        "scheduler": scheduler.stats(),
+        "backends": backend_pool.status(),
+        "warm_pool": warm_pool.status(),
+        "cache": response_cache.stats(),
+        "coalescing": inflight.stats()
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
 
 # NEW: Neuropharmacology endpoint
 @app.post("/api/neuropharmacology")
-async def neuropharmacology_analysis(request: NeuropharmacologyQuery):
+async def neuropharmacology_analysis(request: NeuropharmacologyQuery, http_response: Response,
+                                     x_priority: Optional[str] = Header(None)):
     """
     Specialized endpoint for neuroprotective compound analysis
     Integrates with NeuroDebian neuroscience tools
-    """
 
-    prompt = f"""Analyze the neuropharmacology of {request.compound} for {request.analysis_type}.
-
-Provide:
-1. Neurological mechanism of action
-2. Target brain regions and neurotransmitter systems
-3. Expected neuroimaging biomarkers
-4. Clinical assessment recommendations
-"""
+    Send "X-Priority: bulk" for batch workloads so they queue behind
+    interactive users.
+    """
 
-    if request.include_imaging:
-        prompt += """
-5. Recommended neuroimaging protocols:
-   - MRI sequences for structural changes
-   - fMRI paradigms for functional connectivity
-   - PET tracers for molecular imaging
-   - EEG/MEG for electrophysiological assessment
-"""
+    prompt = neuropharmacology_prompt(request)
 
     try:
-        result = query_ollama(prompt)
+        result = await query_ollama(prompt, response=http_response,
+                                    priority=_priority(x_priority))
 
         response = {
             "compound": request.compound,
             "analysis": result.get("response", ""),
-            "neuroimaging_tools": {
-                "available": request.include_imaging,
-                "fsl_installed": False,  # Check actual installation
-                "afni_installed": False,
-                "python_tools": ["nibabel", "nilearn", "mne"]
-            }
+            "neuroimaging_tools": neuroimaging_tools(request)
         }
 
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Neuropharmacology analysis failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # NEW: Clinical trial neuroimaging endpoint
 @app.post("/api/clinical-trial-neuroimaging")
-async def clinical_trial_neuroimaging(request: ClinicalTrialNeuroimaging):
+async def clinical_trial_neuroimaging(request: ClinicalTrialNeuroimaging, http_response: Response,
+                                      x_priority: Optional[str] = Header(None)):
     """
     Design neuroimaging protocols for clinical trials of mushroom compounds
     """
 
-    modalities = request.imaging_modalities or ["MRI", "fMRI", "PET"]
-
-    prompt = f"""Design a comprehensive neuroimaging protocol for a clinical trial evaluating {request.compound} in {request.indication}.
-
-Include protocols for: {', '.join(modalities)}
-
-Provide:
-1. Imaging timepoints (baseline, follow-up schedule)
-2. MRI sequences and parameters
-3. fMRI task paradigms
-4. PET tracer selection
-5. Image processing pipeline recommendations
-6. Statistical analysis plan for imaging biomarkers
-7. NeuroDebian tools that can be used for analysis
-
-Focus on biomarkers relevant to {request.indication} pathophysiology."""
+    prompt = clinical_trial_neuroimaging_prompt(request)
 
     try:
-        result = query_ollama(prompt, temperature=0.05)
+        result = await query_ollama(prompt, temperature=0.05, response=http_response,
+                                    priority=_priority(x_priority))
 
         return {
             "compound": request.compound,
             "indication": request.indication,
             "imaging_protocol": result.get("response", ""),
-            "recommended_tools": {
-                "preprocessing": "FSL FEAT, AFNI 3dDeconvolve",
-                "connectivity": "Nilearn, FSL MELODIC",
-                "structural": "FSL FIRST, ANTs",
-                "visualization": "FSLeyes, AFNI viewer"
-            }
+            "recommended_tools": RECOMMENDED_IMAGING_TOOLS
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Neuroimaging protocol design failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Streaming variants (Server-Sent Events)
+@app.post("/api/neuropharmacology/stream")
+async def neuropharmacology_analysis_stream(request: NeuropharmacologyQuery,
+                                            x_priority: Optional[str] = Header(None)):
+    """
+    Streaming neuropharmacology analysis: tokens are relayed as they are
+    generated; the final 'done' event carries the tool metadata and latency
+    metrics
+    """
+    return await stream_ollama(
+        neuropharmacology_prompt(request),
+        {"compound": request.compound, "neuroimaging_tools": neuroimaging_tools(request)},
+        priority=_priority(x_priority)
+    )
+
+@app.post("/api/clinical-trial-neuroimaging/stream")
+async def clinical_trial_neuroimaging_stream(request: ClinicalTrialNeuroimaging,
+                                             x_priority: Optional[str] = Header(None)):
+    """
+    Streaming neuroimaging protocol design (Server-Sent Events)
+    """
+    return await stream_ollama(
+        clinical_trial_neuroimaging_prompt(request),
+        {
+            "compound": request.compound,
+            "indication": request.indication,
+            "recommended_tools": RECOMMENDED_IMAGING_TOOLS
+        },
+        temperature=0.05,
+        priority=_priority(x_priority)
+    )
+
 # NEW: Neuroimaging data analysis endpoint
 @app.post("/api/analyze-neuroimaging")
 async def analyze_neuroimaging_data(
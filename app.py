@@ -4,42 +4,97 @@ Pharmaceutical AI Assistant powered by Ollama
 """
 
 import gradio as gr
-import requests
 import json
 import os
 
-# Ollama API endpoint
+from crowelogic_ollama import (
+    BackendPool,
+    BalancedOllamaClient,
+    OllamaError,
+    RequestScheduler,
+    SchedulerRejected
+)
+
+# Ollama API endpoint (OLLAMA_BACKENDS lists several, comma-separated)
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 MODEL_NAME = "CroweLogic-Pharma:latest"
 
-def query_model(prompt, temperature=0.7, max_tokens=2000):
+# Serving limits (generations in flight, queued prompts, longest queue wait)
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "32"))
+OLLAMA_MAX_WAIT = float(os.getenv("OLLAMA_MAX_WAIT", "30"))
+
+# Generations this Space runs at once, across all backends (capped at, and
+# defaulting to, the backends' combined capacity)
+SPACE_CONCURRENCY_LIMIT = os.getenv("SPACE_CONCURRENCY_LIMIT")
+
+backend_pool = BackendPool.from_env(OLLAMA_URL, max_in_flight=OLLAMA_MAX_CONCURRENCY)
+ollama_client = BalancedOllamaClient(backend_pool)
+scheduler = RequestScheduler(
+    max_in_flight=min(int(SPACE_CONCURRENCY_LIMIT or backend_pool.total_capacity()),
+                      backend_pool.total_capacity()),
+    max_queue=OLLAMA_MAX_QUEUE,
+    max_wait=OLLAMA_MAX_WAIT,
+    name="ollama"
+)
+
+async def query_model(prompt, temperature=0.7, max_tokens=2000):
     """Query the CroweLogic-Pharma model"""
 
     try:
-        response = requests.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": MODEL_NAME,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
+        result = await scheduler.submit(
+            lambda: ollama_client.generate(
+                MODEL_NAME,
+                prompt,
+                options={
                     "temperature": temperature,
                     "num_predict": max_tokens
                 }
-            },
-            timeout=120
+            )
         )
+        return result.get("response", "No response generated")
 
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("response", "No response generated")
-        else:
-            return f"Error: {response.status_code} - {response.text}"
-
+    except SchedulerRejected as e:
+        return f"Server busy: {e.reason}. Please retry in {e.headers['Retry-After']} s."
+    except OllamaError as e:
+        return f"Error: {str(e)}"
     except Exception as e:
         return f"Error connecting to model: {str(e)}"
 
 
+async def stream_model(prompt, temperature=0.7, max_tokens=2000):
+    """
+    Stream the CroweLogic-Pharma response as it is generated
+
+    Yields the accumulated text after every token so Gradio re-renders the
+    output incrementally. The backend slot is held until the stream ends
+    or the user navigates away.
+    """
+    text = ""
+    try:
+        async with scheduler.slot():
+            async for chunk in ollama_client.stream_generate(
+                MODEL_NAME,
+                prompt,
+                options={
+                    "temperature": temperature,
+                    "num_predict": max_tokens
+                }
+            ):
+                if chunk.get("response"):
+                    text += chunk["response"]
+                    yield text
+        if not text:
+            yield "No response generated"
+
+    except SchedulerRejected as e:
+        yield f"Server busy: {e.reason}. Please retry in {e.headers['Retry-After']} s."
+    except OllamaError as e:
+        yield f"{text}\n\nError: {str(e)}" if text else f"Error: {str(e)}"
+    except Exception as e:
+        yield f"Error connecting to model: {str(e)}"
+
+
 def create_demo():
     """Create the Gradio interface"""
 
@@ -199,18 +254,21 @@ def create_demo():
         📧 Contact: [GitHub](https://github.com/MichaelCrowe11/crowelogic-pharma-model)
         """)
 
-        # Connect the button
+        # Connect the button; tokens stream into the output box (admission is
+        # bounded by the scheduler, not Gradio's per-event concurrency limit)
         submit_btn.click(
-            fn=query_model,
+            fn=stream_model,
             inputs=[prompt_input, temperature_slider, max_tokens_slider],
-            outputs=output
+            outputs=output,
+            concurrency_limit=None
         )
 
         # Also submit on Enter key
         prompt_input.submit(
-            fn=query_model,
+            fn=stream_model,
             inputs=[prompt_input, temperature_slider, max_tokens_slider],
-            outputs=output
+            outputs=output,
+            concurrency_limit=None
         )
 
     return demo
@@ -0,0 +1,43 @@
+"""
+CroweLogic-Pharma Ollama Client Layer
+Shared serving infrastructure for the API server, Gradio app and CLI
+"""
+
+__version__ = "1.0.0"
+__author__ = "Michael Benjamin Crowe"
+
+from .backends import Backend, BackendPool, BalancedOllamaClient, CircuitBreaker, NoBackendAvailable
+from .cache import ResponseCache
+from .client import AsyncOllamaClient, OllamaError
+from .health import HealthMonitor
+from .metrics import MetricsRegistry, PrometheusMiddleware, ServingMetrics
+from .scheduler import BULK, INTERACTIVE, PRIORITIES, RequestScheduler, SchedulerRejected
+from .singleflight import SingleFlight
+from .streaming import StreamTiming, sse_event, timed_stream
+from .warm import WarmPoolManager, parse_keep_alive
+
+__all__ = [
+    'BULK',
+    'INTERACTIVE',
+    'PRIORITIES',
+    'AsyncOllamaClient',
+    'Backend',
+    'BackendPool',
+    'BalancedOllamaClient',
+    'CircuitBreaker',
+    'HealthMonitor',
+    'MetricsRegistry',
+    'NoBackendAvailable',
+    'OllamaError',
+    'PrometheusMiddleware',
+    'RequestScheduler',
+    'ResponseCache',
+    'SchedulerRejected',
+    'ServingMetrics',
+    'SingleFlight',
+    'StreamTiming',
+    'WarmPoolManager',
+    'parse_keep_alive',
+    'sse_event',
+    'timed_stream'
+]
@@ -0,0 +1,456 @@
+"""
+Ollama Backend Pool
+Health-checked, model-aware load balancing across several Ollama hosts
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+import httpx
+
+from .client import AsyncOllamaClient, OllamaError
+
+
+def normalize_model(name: str) -> str:
+    """Ollama model reference with an explicit tag ('CroweLogic-Pharma' -> 'CroweLogic-Pharma:latest')"""
+    return name if ':' in name else f"{name}:latest"
+
+
+class NoBackendAvailable(OllamaError):
+    """No healthy backend serving the requested model has a free slot"""
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker
+
+    closed -> open after failure_threshold consecutive failures; open ->
+    half_open after reset_timeout, when a single trial request is let
+    through; its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN:
+            return not self._trial_in_flight
+        return self.state == self.CLOSED
+
+    def on_dispatch(self):
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def on_abandon(self):
+        """A request ended without an outcome (cancelled): free the trial slot"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Backend:
+    """
+    One Ollama host
+
+    Attributes:
+        url: Base URL
+        allowed_models: Models this host is configured to serve (None = any)
+        models: Models last reported by /api/tags (None = not yet checked)
+        max_in_flight: Concurrent generations allowed on this host
+        outstanding: Generations currently routed here
+    """
+
+    def __init__(self, url: str, models: Optional[Iterable[str]] = None,
+                 max_in_flight: int = 8, failure_threshold: int = 3,
+                 reset_timeout: float = 30.0):
+        self.url = url.rstrip('/')
+        self.allowed_models: Optional[Set[str]] = (
+            {normalize_model(m) for m in models} if models else None
+        )
+        self.models: Optional[Set[str]] = None
+        self.max_in_flight = max_in_flight
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.outstanding = 0
+        self.healthy = True  # optimistic until the first health check
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+
+    def serves(self, model: str) -> bool:
+        model = normalize_model(model)
+        if self.allowed_models is not None and model not in self.allowed_models:
+            return False
+        return self.models is None or model in self.models
+
+    def available(self) -> bool:
+        return self.healthy and self.breaker.allow()
+
+    def status(self) -> Dict:
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'circuit': self.breaker.state,
+            'outstanding': self.outstanding,
+            'max_in_flight': self.max_in_flight,
+            'models': sorted(self.models) if self.models is not None else None,
+            'allowed_models': sorted(self.allowed_models) if self.allowed_models is not None else None,
+            'latency_ms': round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            'requests': self.requests,
+            'failures': self.failures,
+            'last_checked': self.last_checked,
+            'last_error': self.last_error
+        }
+
+
+class BackendPool:
+    """
+    Set of Ollama backends with least-outstanding-requests routing
+
+    Features:
+    - Model-aware routing: a request only goes to hosts that are configured
+      for, and report (via /api/tags), the requested model
+    - Least outstanding requests, ties broken by observed latency
+    - Per-backend concurrency cap and circuit breaker
+    - Active health checks (sync for the CLI, async for the servers) plus
+      passive health from request outcomes
+    - Thread-safe, so one pool can serve Gradio worker threads
+    """
+
+    def __init__(self, backends: Iterable[Union[Backend, str]], health_interval: float = 10.0):
+        self.backends: List[Backend] = [
+            b if isinstance(b, Backend) else Backend(b) for b in backends
+        ]
+        if not self.backends:
+            raise ValueError("BackendPool needs at least one backend")
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._refresh: Optional[asyncio.Future] = None
+
+    @classmethod
+    def from_spec(cls, spec: Union[str, List], max_in_flight: int = 8, **kwargs) -> 'BackendPool':
+        """
+        Build a pool from a backend specification
+
+        Accepts a list of URLs / dicts, a JSON list, or a comma-separated
+        string of entries 'url' or 'url=model1|model2'.
+
+        Example:
+            "http://gpu-a:11434=CroweLogic-Pharma:pro|CroweLogic-Pharma:standard,http://cpu:11434=CroweLogic-Pharma:mini"
+        """
+        if isinstance(spec, str):
+            spec = spec.strip()
+            if spec.startswith('['):
+                spec = json.loads(spec)
+            else:
+                entries = []
+                for item in filter(None, (part.strip() for part in spec.split(','))):
+                    url, _, models = item.partition('=')
+                    entries.append({'url': url, 'models': models.split('|') if models else None})
+                spec = entries
+
+        backends = []
+        for entry in spec:
+            if isinstance(entry, str):
+                entry = {'url': entry}
+            backends.append(Backend(
+                entry['url'],
+                models=entry.get('models'),
+                max_in_flight=entry.get('max_in_flight', max_in_flight)
+            ))
+        return cls(backends, **kwargs)
+
+    @classmethod
+    def from_env(cls, default_url: str = "http://localhost:11434", **kwargs) -> 'BackendPool':
+        """Pool from OLLAMA_BACKENDS, falling back to OLLAMA_URL / default_url"""
+        spec = os.getenv("OLLAMA_BACKENDS") or os.getenv("OLLAMA_URL") or default_url
+        return cls.from_spec(spec, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def select(self, model: str, exclude: Iterable[Backend] = (), queue: bool = True) -> Backend:
+        """
+        Pick the backend for a request
+
+        Args:
+            model: Requested model
+            exclude: Backends already tried for this request
+            queue: When every eligible backend is at max_in_flight, return
+                the least loaded one anyway (the caller queues on that
+                backend's client) instead of raising
+
+        Raises:
+            NoBackendAvailable: If no backend serves the model, or all that
+                do are unhealthy or open-circuited (or full, with queue=False)
+        """
+        exclude = set(map(id, exclude))
+        with self._lock:
+            serving = [b for b in self.backends if b.serves(model) and id(b) not in exclude]
+            candidates = [b for b in serving if b.available()]
+            if not candidates:
+                if not serving:
+                    raise NoBackendAvailable(f"No backend serves model '{model}'")
+                raise NoBackendAvailable(
+                    f"All {len(serving)} backend(s) for '{model}' are unhealthy or circuit-open"
+                )
+
+            free = [b for b in candidates if b.outstanding < b.max_in_flight]
+            if not free and not queue:
+                raise NoBackendAvailable(f"All backends for '{model}' are at capacity")
+            return min(free or candidates, key=lambda b: (
+                b.outstanding / b.max_in_flight,
+                b.latency_ewma if b.latency_ewma is not None else 0.0
+            ))
+
+    @contextmanager
+    def lease(self, backend: Backend) -> Iterator[Backend]:
+        """
+        Account one request against a backend
+
+        Outcome feeds the circuit breaker: OllamaErrors that indicate a
+        backend fault (connection, timeout, 5xx) count as failures.
+        """
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+            backend.breaker.on_dispatch()
+        start = time.monotonic()
+        try:
+            yield backend
+        except OllamaError as e:
+            with self._lock:
+                if e.backend_fault:
+                    self._record_failure(backend, str(e))
+                else:
+                    backend.breaker.record_success()
+            raise
+        except Exception:
+            with self._lock:
+                backend.breaker.record_success()  # request-side problem
+            raise
+        except BaseException:
+            # CancelledError / GeneratorExit (client went away): no verdict
+            # on the backend, but a half-open trial must not stay claimed
+            with self._lock:
+                backend.breaker.on_abandon()
+            raise
+        else:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                backend.breaker.record_success()
+                backend.latency_ewma = elapsed if backend.latency_ewma is None else (
+                    0.8 * backend.latency_ewma + 0.2 * elapsed
+                )
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def _record_failure(self, backend: Backend, error: str):
+        backend.failures += 1
+        backend.last_error = error
+        backend.breaker.record_failure()
+
+    # ------------------------------------------------------------------
+    # Health checks
+    # ------------------------------------------------------------------
+
+    def _apply_health(self, backend: Backend, tags: Optional[Dict], error: Optional[str]):
+        with self._lock:
+            backend.last_checked = time.time()
+            if error is None:
+                backend.healthy = True
+                backend.last_error = None
+                backend.models = {normalize_model(m['name']) for m in tags.get('models', [])}
+            else:
+                backend.healthy = False
+                backend.last_error = error
+
+    async def check_backend(self, backend: Backend, client: httpx.AsyncClient, timeout: float = 5.0):
+        try:
+            response = await client.get(f"{backend.url}/api/tags", timeout=timeout)
+            response.raise_for_status()
+            self._apply_health(backend, response.json(), None)
+        except (httpx.HTTPError, ValueError) as e:
+            self._apply_health(backend, None, f"{type(e).__name__}: {e}")
+
+    async def check_all(self, timeout: float = 5.0):
+        """Probe every backend's /api/tags concurrently"""
+        async with httpx.AsyncClient() as client:
+            await asyncio.gather(*(self.check_backend(b, client, timeout) for b in self.backends))
+
+    def check_all_sync(self, timeout: float = 5.0):
+        """Blocking variant of check_all (CLI)"""
+        with httpx.Client() as client:
+            for backend in self.backends:
+                try:
+                    response = client.get(f"{backend.url}/api/tags", timeout=timeout)
+                    response.raise_for_status()
+                    self._apply_health(backend, response.json(), None)
+                except (httpx.HTTPError, ValueError) as e:
+                    self._apply_health(backend, None, f"{type(e).__name__}: {e}")
+
+    def stale(self) -> bool:
+        """Whether any backend's health is older than health_interval"""
+        now = time.time()
+        return any(b.last_checked is None or now - b.last_checked > self.health_interval
+                   for b in self.backends)
+
+    async def refresh_if_stale(self):
+        """
+        On-demand health checking for processes without a background loop
+
+        The first call waits for a full check (models are unknown until
+        then); later stale checks refresh in the background.
+        """
+        if not self.stale():
+            return
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.ensure_future(self.check_all())
+        if all(b.last_checked is None for b in self.backends):
+            await asyncio.shield(self._refresh)
+
+    async def run_health_checks(self):
+        """Re-check all backends every health_interval seconds (run as a task)"""
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.health_interval)
+
+    def total_capacity(self) -> int:
+        return sum(b.max_in_flight for b in self.backends)
+
+    def models(self) -> Set[str]:
+        """Models served by at least one healthy backend"""
+        with self._lock:
+            served = set()
+            for backend in self.backends:
+                if backend.healthy and backend.models:
+                    served.update(m for m in backend.models if backend.serves(m))
+            return served
+
+    def status(self) -> List[Dict]:
+        with self._lock:
+            return [b.status() for b in self.backends]
+
+
+class BalancedOllamaClient:
+    """
+    Drop-in replacement for AsyncOllamaClient that spreads requests over a
+    BackendPool
+
+    Requests that fail with a backend fault before producing output are
+    retried on another backend (up to `retries` times).
+    """
+
+    def __init__(self, pool: BackendPool, retries: int = 1, **client_kwargs):
+        self.pool = pool
+        self.retries = retries
+        self._clients: Dict[str, AsyncOllamaClient] = {
+            b.url: AsyncOllamaClient(b.url, max_concurrency=b.max_in_flight, **client_kwargs)
+            for b in pool.backends
+        }
+
+    @property
+    def in_flight(self) -> int:
+        return sum(c.in_flight for c in self._clients.values())
+
+    def client_for(self, backend: Backend) -> AsyncOllamaClient:
+        """The pooled client of one backend (for per-host operations)"""
+        return self._clients[backend.url]
+
+    async def aclose(self):
+        for c in self._clients.values():
+            await c.aclose()
+
+    async def __aenter__(self) -> 'BalancedOllamaClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _select(self, model: str, tried: List[Backend], last_error: Optional[OllamaError]) -> Backend:
+        try:
+            backend = self.pool.select(model, exclude=tried)
+        except NoBackendAvailable:
+            if last_error is not None:
+                raise last_error  # report the real failure, not the exhausted pool
+            raise
+        tried.append(backend)
+        return backend
+
+    async def generate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                       timeout: Optional[float] = None,
+                       keep_alive: Optional[Union[str, float]] = None) -> Dict:
+        """Non-streaming /api/generate on the least-loaded backend serving model"""
+        await self.pool.refresh_if_stale()
+        tried: List[Backend] = []
+        last_error = None
+        for _ in range(self.retries + 1):
+            backend = self._select(model, tried, last_error)
+            try:
+                with self.pool.lease(backend):
+                    return await self._clients[backend.url].generate(
+                        model, prompt, options, timeout, keep_alive)
+            except OllamaError as e:
+                if not e.backend_fault:
+                    raise
+                last_error = e
+        raise last_error
+
+    async def stream_generate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                              timeout: Optional[float] = None,
+                              keep_alive: Optional[Union[str, float]] = None) -> AsyncIterator[Dict]:
+        """Streaming /api/generate; fails over only before the first chunk"""
+        await self.pool.refresh_if_stale()
+        tried: List[Backend] = []
+        last_error = None
+        for _ in range(self.retries + 1):
+            backend = self._select(model, tried, last_error)
+            started = False
+            try:
+                with self.pool.lease(backend):
+                    async for chunk in self._clients[backend.url].stream_generate(
+                            model, prompt, options, timeout, keep_alive):
+                        started = True
+                        yield chunk
+                return
+            except OllamaError as e:
+                if started or not e.backend_fault:
+                    raise
+                last_error = e
+        raise last_error
+
+    async def tags(self, timeout: float = 5.0) -> Dict:
+        """Union of the models reported by healthy backends"""
+        return {'models': [{'name': m, 'model': m} for m in sorted(self.pool.models())]}
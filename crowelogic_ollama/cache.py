@@ -0,0 +1,260 @@
+"""
+Response Cache for Ollama Generations
+Prompt-keyed storage of completed generations with TTL and LRU eviction
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Two-tier cache for Ollama /api/generate responses
+
+    Features:
+    - Keys on model name, normalized prompt and generation options
+    - In-memory LRU with size-bounded eviction and per-entry TTL
+    - Optional SQLite store shared across restarts and workers
+    - Only caches low-temperature (or seeded) generations, whose output
+      is effectively deterministic
+    - Hit/miss statistics
+    - aget/aset for the servers: memory hits are answered inline, SQLite
+      work runs in a worker thread so it never blocks the event loop
+
+    The disk row count is kept in memory; expired rows are purged (through
+    the expires index) at most every purge_interval seconds, which also
+    re-reads the count written by other workers sharing the file.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0,
+                 path: Optional[str] = None, max_disk_entries: int = 100000,
+                 max_temperature: float = 0.1, purge_interval: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.max_temperature = max_temperature
+        self.purge_interval = purge_interval
+        self.path = Path(path).expanduser() if path else None
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and statistics
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'disk_evictions': 0
+        }
+
+        self._db = None
+        self._db_lock = threading.Lock()  # one SQLite statement sequence at a time
+        self._disk_count = 0
+        self._purged_at = 0.0
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache (accessed)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS response_cache_expires ON response_cache (expires)"
+            )
+            self._db.commit()
+            self._purge(time.time())
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """
+        Canonical form of a prompt
+
+        Unicode NFC, runs of spaces/tabs collapsed, trailing whitespace and
+        blank lines removed. Wording and case are preserved.
+        """
+        prompt = unicodedata.normalize('NFC', prompt)
+        lines = (re.sub(r'[ \t]+', ' ', line).strip() for line in prompt.splitlines())
+        return '\n'.join(line for line in lines if line)
+
+    @classmethod
+    def prompt_key(cls, model: str, prompt: str, options: Optional[Dict] = None) -> str:
+        """
+        Cache key for a generation request
+
+        Args:
+            model: Ollama model name
+            prompt: Prompt text (normalized before hashing)
+            options: Generation options (temperature, num_predict, ...)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        canonical = json.dumps(
+            {'model': model, 'prompt': cls.normalize_prompt(prompt), 'options': options or {}},
+            sort_keys=True, separators=(',', ':')
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def cacheable(self, options: Optional[Dict] = None) -> bool:
+        """Whether a generation with these options is deterministic enough to reuse"""
+        options = options or {}
+        if options.get('seed') is not None:
+            return True
+        return float(options.get('temperature', 0.8)) <= self.max_temperature
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Look up a cached response (memory first, then disk)"""
+        value = self._memory_get(key, time.time())
+        if value is None and self._db is not None:
+            value = self._disk_get(key, time.time())
+        return self._count_lookup(value)
+
+    async def aget(self, key: str) -> Optional[Dict]:
+        """get() for async callers: disk lookups run in a worker thread"""
+        value = self._memory_get(key, time.time())
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key, time.time())
+        return self._count_lookup(value)
+
+    def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        """Store a response in memory and, if configured, on disk"""
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires)
+        if self._db is not None:
+            self._disk_set(key, json.dumps(value), expires, now)
+
+    async def aset(self, key: str, value: Dict, ttl: Optional[float] = None):
+        """set() for async callers: the disk write runs in a worker thread"""
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, json.dumps(value), expires, now)
+
+    def clear(self):
+        """Drop all cached entries (memory and disk)"""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM response_cache")
+                self._db.commit()
+                self._disk_count = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss statistics and current sizes (no disk access)"""
+        with self._lock:
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            lookups = hits + self._stats['misses']
+            return {
+                **self._stats,
+                'hits': hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'disk_entries': self._disk_count
+            }
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires > now:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return value
+            del self._memory[key]
+            self._stats['expired'] += 1
+            return None
+
+    def _count_lookup(self, value: Optional[Dict]) -> Optional[Dict]:
+        if value is None:
+            with self._lock:
+                self._stats['misses'] += 1
+        return value
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._disk_count -= self._db.execute(
+                    "DELETE FROM response_cache WHERE key = ?", (key,)
+                ).rowcount
+                self._db.commit()
+                expired = True
+            else:
+                self._db.execute("UPDATE response_cache SET accessed = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                expired = False
+
+        with self._lock:
+            if expired:
+                self._stats['expired'] += 1
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self._stats['disk_hits'] += 1
+            return value
+
+    def _disk_set(self, key: str, text: str, expires: float, now: float):
+        with self._db_lock:
+            row = (text, expires, now, key)
+            if self._db.execute(
+                "INSERT OR IGNORE INTO response_cache (value, expires, accessed, key) "
+                "VALUES (?, ?, ?, ?)", row
+            ).rowcount:
+                self._disk_count += 1
+            else:
+                self._db.execute(
+                    "UPDATE response_cache SET value = ?, expires = ?, accessed = ? WHERE key = ?", row
+                )
+
+            if now - self._purged_at >= self.purge_interval:
+                self._purge(now)
+            overflow = self._disk_count - self.max_disk_entries
+            if overflow > 0:
+                evicted = self._db.execute(
+                    "DELETE FROM response_cache WHERE key IN ("
+                    "SELECT key FROM response_cache ORDER BY accessed LIMIT ?)", (overflow,)
+                ).rowcount
+                self._disk_count -= evicted
+                with self._lock:
+                    self._stats['disk_evictions'] += evicted
+            self._db.commit()
+
+    def _purge(self, now: float):
+        """Drop expired rows and re-read the row count (caller holds _db_lock or is __init__)"""
+        self._db.execute("DELETE FROM response_cache WHERE expires <= ?", (now,))
+        self._db.commit()
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        self._purged_at = now
+
+    def _remember(self, key: str, value: Dict, expires: float):
+        """Insert into the LRU, evicting the least recently used entries"""
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
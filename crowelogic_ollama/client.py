@@ -0,0 +1,206 @@
+"""
+Async Ollama Client
+Pooled, concurrency-bounded access to the Ollama HTTP API
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Optional, Union
+
+import httpx
+
+
+class OllamaError(Exception):
+    """
+    Ollama request failed, timed out or returned an error status
+
+    Attributes:
+        status_code: HTTP status returned by the backend (None for
+            connection errors and timeouts)
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def backend_fault(self) -> bool:
+        """True for failures that say something about the backend's health
+        (unreachable, timed out, 5xx) rather than about the request"""
+        return self.status_code is None or self.status_code >= 500
+
+    @classmethod
+    def from_httpx(cls, error: httpx.HTTPError) -> 'OllamaError':
+        status = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        return cls(f"{type(error).__name__}: {error}", status_code=status)
+
+
+class AsyncOllamaClient:
+    """
+    Shared async client for an Ollama backend
+
+    Features:
+    - One pooled httpx.AsyncClient with keep-alive connections
+    - Per-request timeouts
+    - Bounded concurrency (semaphore) so a burst of users cannot open
+      unbounded upstream generations
+    - Default keep_alive sent with every generation, so ordinary traffic
+      does not reset a pinned model to Ollama's 5 minute idle unload
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434",
+                 max_concurrency: int = 8,
+                 max_connections: int = 32,
+                 keepalive_expiry: float = 60.0,
+                 timeout: float = 120.0,
+                 connect_timeout: float = 5.0,
+                 keep_alive: Optional[Union[str, float]] = None):
+        self.base_url = base_url.rstrip('/')
+        self.keep_alive = keep_alive
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client (created on first use)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> 'AsyncOllamaClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently holding a concurrency slot"""
+        return self._in_flight
+
+    def _payload(self, model: str, prompt: str, stream: bool, options: Optional[Dict],
+                 keep_alive: Optional[Union[str, float]]) -> Dict:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options or {}
+        }
+        keep_alive = self.keep_alive if keep_alive is None else keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
+    async def generate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                       timeout: Optional[float] = None,
+                       keep_alive: Optional[Union[str, float]] = None) -> Dict:
+        """
+        Non-streaming /api/generate call
+
+        Args:
+            model: Ollama model name
+            prompt: Prompt text
+            options: Ollama generation options (temperature, num_predict, ...)
+            timeout: Overall timeout for this request in seconds
+            keep_alive: How long Ollama keeps the model loaded afterwards
+                ("30m", seconds, -1 = indefinitely); defaults to the client's
+
+        Returns:
+            Ollama response JSON
+
+        Raises:
+            OllamaError: On connection errors, timeouts or non-2xx responses
+        """
+        payload = self._payload(model, prompt, False, options, keep_alive)
+
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                response = await self.client.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                raise OllamaError.from_httpx(e) from e
+            finally:
+                self._in_flight -= 1
+
+    async def stream_generate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                              timeout: Optional[float] = None,
+                              keep_alive: Optional[Union[str, float]] = None) -> AsyncIterator[Dict]:
+        """
+        Streaming /api/generate call
+
+        Yields Ollama's NDJSON chunks as they arrive ({'response': token,
+        'done': False, ...}); the last chunk has 'done': True and carries
+        eval_count / eval_duration. The concurrency slot is held until the
+        stream is exhausted or closed.
+
+        Raises:
+            OllamaError: On connection errors, timeouts, non-2xx responses or
+                an error line in the stream
+        """
+        payload = self._payload(model, prompt, True, options, keep_alive)
+
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                async with self.client.stream(
+                    "POST",
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=timeout if timeout is not None else self.timeout
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if "error" in chunk:
+                            raise OllamaError(chunk["error"])
+                        yield chunk
+                        if chunk.get("done"):
+                            return
+            except json.JSONDecodeError as e:
+                raise OllamaError(f"Malformed stream line: {e}") from e
+            except httpx.HTTPError as e:
+                raise OllamaError.from_httpx(e) from e
+            finally:
+                self._in_flight -= 1
+
+    async def tags(self, timeout: float = 5.0) -> Dict:
+        """List models available on the backend (/api/tags)"""
+        try:
+            response = await self.client.get(f"{self.base_url}/api/tags", timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise OllamaError.from_httpx(e) from e
+
+    async def ps(self, timeout: float = 5.0) -> Dict:
+        """List models currently loaded in memory (/api/ps)"""
+        try:
+            response = await self.client.get(f"{self.base_url}/api/ps", timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise OllamaError.from_httpx(e) from e
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Ollama Backend Pool Demo
+Model-aware, least-outstanding routing and circuit breaking across three
+local stub Ollama servers
+"""
+
+import sys
+sys.path.insert(0, '../..')
+
+import asyncio
+import logging
+from collections import Counter
+
+from crowelogic_ollama import BackendPool, BalancedOllamaClient, OllamaError
+from crowelogic_ollama.stub import StubOllamaServer
+
+MINI = "CroweLogic-Pharma:mini"
+STANDARD = "CroweLogic-Pharma:standard"
+PRO = "CroweLogic-Pharma:pro"
+
+
+def print_status(pool):
+    for status in pool.status():
+        latency = f"{status['latency_ms']:.0f} ms" if status['latency_ms'] is not None else "-"
+        print(f"   {status['url']:<26} {'up' if status['healthy'] else 'DOWN':<5} "
+              f"circuit={status['circuit']:<10} requests={status['requests']:<4} "
+              f"failures={status['failures']:<3} latency={latency}")
+
+
+async def route(client, stubs, model, n):
+    """Send n concurrent generations for model; count which host served each"""
+    before = {name: stub.requests_served for name, stub in stubs.items()}
+    errors = Counter()
+
+    async def one(i):
+        try:
+            await client.generate(model, f"compound {i}")
+        except OllamaError as e:
+            errors[str(e)] += 1
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+    served = {name: stub.requests_served - before[name] for name, stub in stubs.items()}
+    spread = ", ".join(f"{name}={count}" for name, count in served.items())
+    for error, count in errors.items():
+        spread += f", failed={count} ({error})"
+    print(f"   {model:<28} {spread}")
+
+
+async def demo(stubs, pool):
+    async with BalancedOllamaClient(pool) as client:
+        await pool.check_all()
+
+        print("\n1. Model-aware routing (24 concurrent requests per model)\n")
+        for model in (MINI, STANDARD, PRO):
+            await route(client, stubs, model, 24)
+
+        print("\n2. Host 'b' starts failing with HTTP 500\n")
+        stubs['b'].fail_status = 500
+        await route(client, stubs, MINI, 24)
+        print()
+        print_status(pool)
+
+        print("\n3. Host 'a' goes away, health check runs\n")
+        stubs['a'].stop()
+        await pool.check_all()
+        print_status(pool)
+        print()
+        await route(client, stubs, MINI, 4)
+
+
+def main():
+    print("\n" + "="*80)
+    print("OLLAMA BACKEND POOL DEMO (stub Ollama backends)")
+    print("="*80)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    stubs = {
+        'a': StubOllamaServer(models=[MINI], first_token_delay=0.02, n_tokens=20),
+        'b': StubOllamaServer(models=[MINI, STANDARD], first_token_delay=0.02, n_tokens=20),
+        'c': StubOllamaServer(models=[STANDARD, PRO], first_token_delay=0.02, n_tokens=20)
+    }
+    for stub in stubs.values():
+        stub.start()
+
+    # 'c' is reserved for the pro model even though it also has standard
+    pool = BackendPool.from_spec(
+        f"{stubs['a'].url},{stubs['b'].url},{stubs['c'].url}={PRO}",
+        max_in_flight=4
+    )
+    for name, stub in stubs.items():
+        print(f"   {name}: {stub.url}  models={stub.models}")
+
+    try:
+        asyncio.run(demo(stubs, pool))
+    finally:
+        for stub in stubs.values():
+            stub.stop()
+
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Gradio App Streaming Benchmark
+Time to first visible text vs. time to full response for the Gradio app's
+handlers: the original blocking requests.post, the pooled query_model and
+the streaming stream_model, all against a local stub Ollama server
+"""
+
+import sys
+sys.path.insert(0, '../..')
+
+import asyncio
+import importlib
+import logging
+import os
+import statistics
+import time
+
+import requests
+
+from crowelogic_ollama.stub import StubOllamaServer
+
+MODEL_NAME = "CroweLogic-Pharma:latest"
+PROMPT = "What are the neuroprotective mechanisms of hericenones from Lion's Mane mushroom?"
+
+
+def load_app(ollama_url, concurrency):
+    """Import app.py pointed at the stub backend (requires gradio)"""
+    os.environ['OLLAMA_URL'] = ollama_url
+    os.environ['OLLAMA_MAX_CONCURRENCY'] = str(concurrency)
+    os.environ['SPACE_CONCURRENCY_LIMIT'] = str(concurrency)
+    module = importlib.import_module('app')
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    return module
+
+
+def blocking_handler(ollama_url):
+    """The previous query_model: blocking requests.post, no session reuse
+    (Gradio ran it in a worker thread)"""
+    def query(prompt):
+        response = requests.post(
+            f"{ollama_url}/api/generate",
+            json={"model": MODEL_NAME, "prompt": prompt, "stream": False,
+                  "options": {"temperature": 0.7, "num_predict": 2000}},
+            timeout=120
+        )
+        return response.json().get("response", "")
+
+    async def handler(prompt):
+        yield await asyncio.to_thread(query, prompt)
+    return handler
+
+
+def single(fn):
+    """Adapt a coroutine handler to the generator interface"""
+    async def handler(prompt):
+        yield await fn(prompt)
+    return handler
+
+
+async def run_user(handler):
+    start = time.perf_counter()
+    first = None
+    async for text in handler(PROMPT):
+        if first is None and text:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def measure(handlers, n_users):
+    for label, handler in handlers:
+        results = await asyncio.gather(*(run_user(handler) for _ in range(n_users)))
+        first = [r[0] for r in results]
+        total = [r[1] for r in results]
+        print(f"   {label:<32} first text p50 {statistics.median(first) * 1e3:7.0f} ms   "
+              f"full response p50 {statistics.median(total) * 1e3:7.0f} ms")
+
+
+def main(n_users=8, concurrency=8):
+    print("\n" + "="*80)
+    print("GRADIO APP STREAMING BENCHMARK (stub Ollama backend)")
+    print("="*80)
+
+    with StubOllamaServer(models=[MODEL_NAME], first_token_delay=0.3,
+                          token_delay=0.02, n_tokens=200) as stub:
+        app = load_app(stub.url, concurrency)
+        print(f"\n   Users: {n_users}   SPACE_CONCURRENCY_LIMIT: {concurrency}   "
+              f"Stub: 300 ms to first token, 200 tokens at 50 tok/s\n")
+
+        async def run():
+            await measure([
+                ("requests.post (previous)", blocking_handler(stub.url)),
+                ("query_model (pooled)", single(app.query_model)),
+                ("stream_model (pooled, streaming)", app.stream_model),
+            ], n_users)
+            await app.ollama_client.aclose()
+
+        asyncio.run(run())
+
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
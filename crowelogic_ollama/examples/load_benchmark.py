@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+NeuroDebian API Load Benchmark
+Blocking requests.post (previous server) vs. the pooled async Ollama client,
+both against a local stub Ollama server
+"""
+
+import sys
+sys.path.insert(0, '../..')
+
+import asyncio
+import importlib.util
+import logging
+import os
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+import requests
+
+from crowelogic_ollama.stub import StubOllamaServer
+
+MODEL_NAME = "CroweLogic-Pharma:120b-v2"
+SERVER_FILE = Path(__file__).resolve().parents[2] / '1211' / 'api_server_neurodebian.py'
+
+
+def load_server(ollama_url, concurrency):
+    """Import the API server module pointed at the stub backend"""
+    os.environ['OLLAMA_URL'] = ollama_url
+    os.environ['OLLAMA_MAX_CONCURRENCY'] = str(concurrency)
+    spec = importlib.util.spec_from_file_location('api_server_neurodebian', SERVER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_load(call, n_requests, concurrency):
+    """Fire n_requests through call() with at most `concurrency` in flight"""
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with gate:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return time.perf_counter() - start, latencies
+
+
+def report(label, elapsed, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"   {label:<34} {len(latencies) / elapsed:8.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1e3:7.0f} ms   p95 {p95 * 1e3:7.0f} ms")
+
+
+async def benchmark(stub, n_requests, concurrency):
+    # Previous server: blocking requests.post inside an async endpoint
+    async def blocking_call(i):
+        response = requests.post(
+            f"{stub.url}/api/generate",
+            json={"model": MODEL_NAME, "prompt": f"compound {i}", "stream": False,
+                  "options": {"temperature": 0.05}},
+            timeout=120
+        )
+        response.raise_for_status()
+
+    elapsed, latencies = await run_load(blocking_call, n_requests, concurrency)
+    report("blocking requests.post", elapsed, latencies)
+
+    # Current server, end to end through the FastAPI app
+    server = load_server(stub.url, concurrency)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+        # A distinct compound per request: every call is a real generation,
+        # never a response cache or coalescing hit
+        async def api_call(i):
+            response = await api.post("/api/neuropharmacology",
+                                      json={"compound": f"compound_{i}"}, timeout=120)
+            response.raise_for_status()
+            assert response.headers["X-Cache"] == "MISS" and response.headers["X-Coalesced"] == "false"
+
+        elapsed, latencies = await run_load(api_call, n_requests, concurrency)
+        report("/api/neuropharmacology (pooled)", elapsed, latencies)
+    await server.ollama_client.aclose()
+
+
+def main(n_requests=200, concurrency=32):
+    print("\n" + "="*80)
+    print("NEURODEBIAN API LOAD BENCHMARK (stub Ollama backend)")
+    print("="*80)
+
+    with StubOllamaServer(models=[MODEL_NAME], first_token_delay=0.05,
+                          token_delay=0.002, n_tokens=50) as stub:
+        print(f"\n   Requests: {n_requests}   Concurrency: {concurrency}   "
+              f"Stub generation time: {0.05 + 0.002 * 50:.2f} s\n")
+        asyncio.run(benchmark(stub, n_requests, concurrency))
+
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
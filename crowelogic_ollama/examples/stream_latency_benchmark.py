@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Streaming Latency Benchmark
+Time to first token on the SSE endpoints vs. full-response latency on the
+blocking endpoints, served by uvicorn against a local stub Ollama server
+"""
+
+import sys
+sys.path.insert(0, '../..')
+
+import asyncio
+import importlib.util
+import logging
+import os
+import socket
+import statistics
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+from crowelogic_ollama.stub import StubOllamaServer
+
+MODEL_NAME = "CroweLogic-Pharma:120b-v2"
+SERVER_FILE = Path(__file__).resolve().parents[2] / '1211' / 'api_server_neurodebian.py'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_api(ollama_url):
+    """Run the API server under uvicorn in a background thread"""
+    os.environ['OLLAMA_URL'] = ollama_url
+    spec = importlib.util.spec_from_file_location('api_server_neurodebian', SERVER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.getLogger('api_server_neurodebian').setLevel(logging.WARNING)
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(module.app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def assert_generated(response):
+    """The request was a fresh generation, not a cache or coalescing hit"""
+    assert response.headers["X-Cache"] == "MISS" and response.headers["X-Coalesced"] == "false"
+
+
+async def blocking_request(client, path, body):
+    start = time.perf_counter()
+    response = await client.post(path, json=body)
+    response.raise_for_status()
+    assert_generated(response)
+    total = time.perf_counter() - start
+    return total, total
+
+
+async def streaming_request(client, path, body):
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream('POST', path, json=body) as response:
+        response.raise_for_status()
+        assert_generated(response)
+        async for line in response.aiter_lines():
+            if first_token is None and line.startswith('event: token'):
+                first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+
+async def measure(api_url, n_requests, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=300) as client:
+        for label, path, call in [
+            ("POST /api/neuropharmacology", "/api/neuropharmacology", blocking_request),
+            ("POST /api/neuropharmacology/stream", "/api/neuropharmacology/stream", streaming_request),
+        ]:
+            # A distinct compound per request and endpoint, so every request is a
+            # real generation rather than a response cache or coalescing hit
+            async def one(i):
+                body = {"compound": f"{path.rsplit('/', 1)[-1]}_compound_{i}",
+                        "analysis_type": "neuroprotection"}
+                async with gate:
+                    return await call(client, path, body)
+
+            results = await asyncio.gather(*(one(i) for i in range(n_requests)))
+            first = [r[0] for r in results]
+            total = [r[1] for r in results]
+            print(f"   {label:<36} first token p50 {statistics.median(first) * 1e3:7.0f} ms   "
+                  f"total p50 {statistics.median(total) * 1e3:7.0f} ms")
+
+
+def main(n_requests=16, concurrency=4):
+    print("\n" + "="*80)
+    print("STREAMING LATENCY BENCHMARK (stub Ollama backend)")
+    print("="*80)
+
+    with StubOllamaServer(models=[MODEL_NAME], first_token_delay=0.3,
+                          token_delay=0.02, n_tokens=200) as stub:
+        server, api_url = start_api(stub.url)
+        print(f"\n   Requests: {n_requests}   Concurrency: {concurrency}   "
+              f"Stub: 300 ms to first token, 200 tokens at 50 tok/s\n")
+        try:
+            asyncio.run(measure(api_url, n_requests, concurrency))
+        finally:
+            server.should_exit = True
+
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
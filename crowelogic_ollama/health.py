@@ -0,0 +1,138 @@
+"""
+Upstream Health Monitor
+Background polling of Ollama backends with an in-memory health snapshot
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+from .backends import BackendPool, normalize_model
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """
+    Polls every backend in a BackendPool on an interval and keeps the result
+    in memory, so health endpoints never touch Ollama themselves
+
+    Features:
+    - One /api/tags probe per backend per interval, however often /health
+      is hit (k8s liveness/readiness, load balancer checks)
+    - Cached model availability: which healthy backends serve each model
+    - Snapshot age and a stale flag when polling falls behind (a hung
+      backend, a stopped monitor)
+    """
+
+    def __init__(self, pool: BackendPool, models: Iterable[str] = (),
+                 interval: Optional[float] = None, stale_after: Optional[float] = None,
+                 timeout: float = 5.0):
+        """
+        Args:
+            pool: Backends to poll
+            models: Models whose availability decides overall health
+            interval: Seconds between polls (defaults to pool.health_interval)
+            stale_after: Snapshot age treated as stale (default 3 intervals)
+            timeout: Per-backend probe timeout
+        """
+        self.pool = pool
+        self.models = [normalize_model(m) for m in models]
+        self.interval = pool.health_interval if interval is None else interval
+        self.stale_after = 3 * self.interval if stale_after is None else stale_after
+        self.timeout = timeout
+
+        self.checks = 0
+        self._snapshot: Optional[Dict] = None
+        self._checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Run a first check, then keep polling in the background"""
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check(self):
+        """Probe all backends now and replace the snapshot"""
+        started = time.perf_counter()
+        await self.pool.check_all(timeout=self.timeout)
+        self._snapshot = self._build(time.perf_counter() - started)
+        self._checked_at = time.monotonic()
+        self.checks += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:  # keep polling; staleness reports the gap
+                logger.error(f"Health check failed: {e}")
+
+    def _build(self, duration: float) -> Dict:
+        backends = self.pool.status()
+        available = {}
+        for backend in self.pool.backends:
+            if backend.healthy and backend.models:
+                for model in backend.models:
+                    if backend.serves(model):
+                        available.setdefault(model, []).append(backend.url)
+
+        required = self.models or sorted(available)
+        missing = [m for m in required if m not in available]
+        healthy = bool(available) and not missing
+        return {
+            'status': 'healthy' if healthy else 'unhealthy',
+            'healthy': healthy,
+            'models': {m: available.get(m, []) for m in required},
+            'missing_models': missing,
+            'backends_up': sum(1 for b in backends if b['healthy']),
+            'backends_total': len(backends),
+            'backends': [
+                {'url': b['url'], 'healthy': b['healthy'], 'circuit': b['circuit'],
+                 'error': b['last_error']}
+                for b in backends
+            ],
+            'checked_at': time.time(),
+            'check_ms': round(duration * 1000, 1)
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed check"""
+        if self._checked_at is None:
+            return None
+        return time.monotonic() - self._checked_at
+
+    def snapshot(self) -> Dict:
+        """Last health result with its age; never performs I/O"""
+        if self._snapshot is None:
+            return {'status': 'starting', 'healthy': False, 'stale': True, 'age_seconds': None}
+        age = time.monotonic() - self._checked_at
+        return {
+            **self._snapshot,
+            'age_seconds': round(age, 3),
+            'stale': age > self.stale_after or not self.running
+        }
+
+    def available(self, model: str) -> bool:
+        """Whether a healthy backend served model at the last check"""
+        if self._snapshot is None:
+            return False
+        model = normalize_model(model)
+        return any(
+            b.healthy and b.models and model in b.models and b.serves(model)
+            for b in self.pool.backends
+        )
@@ -0,0 +1,460 @@
+"""
+Serving Metrics
+Prometheus text-format counters, gauges and histograms for the API server
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds: covers cached replies (~1 ms) up to the 120 s Ollama timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 20.0, 30.0, 60.0, 120.0)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200, 300)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> ([count per bucket (non-cumulative) + overflow], sum)
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Collected(_Metric):
+    """Metric whose samples are read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, kind: str, labels: Iterable[str],
+                 collect: Callable[[], Dict[LabelKey, float]]):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> List[str]:
+        values = self._collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in sorted(values.items()) if value is not None]
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text format
+
+    Metrics are created through counter(), gauge() and histogram(); state
+    owned by other components (queue depth, cache statistics) is exposed
+    with collect(), which reads it at scrape time instead of mirroring it.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def collect(self, name: str, documentation: str, collect: Callable[[], Dict],
+                kind: str = 'gauge', labels: Iterable[str] = ()):
+        """
+        Register a callback metric
+
+        Args:
+            collect: Returns a number, or a dict of label-value tuples to
+                numbers (None values are skipped)
+            kind: 'gauge' or 'counter'
+        """
+        self._register(_Collected(name, documentation, kind, labels, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class ServingMetrics:
+    """
+    Standard metrics for an Ollama-backed API server
+
+    Features:
+    - Per-endpoint HTTP request counts, latency histograms and requests in
+      progress (via PrometheusMiddleware)
+    - Upstream Ollama latency, time to first token and generation
+      throughput (tokens/sec from Ollama's eval_count / eval_duration)
+    - Response cache hit rates, scheduler queue depth and rejections,
+      coalescing and per-backend health, read live from those components
+    """
+
+    def __init__(self, namespace: str = 'crowelogic', registry: Optional[MetricsRegistry] = None):
+        self.namespace = namespace
+        self.registry = registry or MetricsRegistry()
+        r, ns = self.registry, namespace
+
+        self.http_requests = r.counter(
+            f'{ns}_http_requests_total', 'HTTP requests by endpoint and status',
+            ('method', 'endpoint', 'status'))
+        self.http_latency = r.histogram(
+            f'{ns}_http_request_duration_seconds',
+            'HTTP request latency (streams: until the last event)', ('method', 'endpoint'))
+        self.http_in_progress = r.gauge(
+            f'{ns}_http_requests_in_progress', 'HTTP requests being served')
+
+        self.upstream_latency = r.histogram(
+            f'{ns}_ollama_request_duration_seconds',
+            'Ollama generation latency, excluding queue wait', ('model', 'mode'))
+        self.upstream_errors = r.counter(
+            f'{ns}_ollama_errors_total', 'Failed Ollama generations', ('model', 'mode'))
+        self.time_to_first_token = r.histogram(
+            f'{ns}_ollama_time_to_first_token_seconds',
+            'Time from dispatch to the first streamed token', ('model',))
+        self.tokens_per_second = r.histogram(
+            f'{ns}_ollama_tokens_per_second',
+            'Generation throughput per request (eval_count / eval_duration)', ('model',),
+            buckets=TOKEN_RATE_BUCKETS)
+        self.generated_tokens = r.counter(
+            f'{ns}_ollama_generated_tokens_total', 'Tokens generated (eval_count)', ('model',))
+        self.eval_seconds = r.counter(
+            f'{ns}_ollama_eval_seconds_total', 'Time spent generating (eval_duration)', ('model',))
+        self.load_seconds = r.histogram(
+            f'{ns}_ollama_load_duration_seconds', 'Model load time reported by Ollama', ('model',))
+        self.queue_wait = r.histogram(
+            f'{ns}_scheduler_wait_seconds', 'Time spent queued for a backend slot', ('priority',))
+
+    # ------------------------------------------------------------------
+    # Upstream observations
+    # ------------------------------------------------------------------
+
+    def observe_generation(self, model: str, mode: str, seconds: float,
+                           result: Optional[Dict] = None, first_token_seconds: Optional[float] = None):
+        """
+        Record one completed Ollama generation
+
+        Args:
+            mode: 'generate' or 'stream'
+            seconds: Upstream latency
+            result: Final Ollama response or 'done' chunk (eval_count,
+                eval_duration and load_duration in nanoseconds)
+            first_token_seconds: Time to first token (streams)
+        """
+        self.upstream_latency.observe(seconds, model=model, mode=mode)
+        if first_token_seconds is not None:
+            self.time_to_first_token.observe(first_token_seconds, model=model)
+
+        result = result or {}
+        eval_count, eval_duration = result.get('eval_count'), result.get('eval_duration')
+        if eval_count and eval_duration:
+            self.generated_tokens.inc(eval_count, model=model)
+            self.eval_seconds.inc(eval_duration / 1e9, model=model)
+            self.tokens_per_second.observe(eval_count / (eval_duration / 1e9), model=model)
+        if result.get('load_duration'):
+            self.load_seconds.observe(result['load_duration'] / 1e9, model=model)
+
+    def observe_error(self, model: str, mode: str):
+        self.upstream_errors.inc(model=model, mode=mode)
+
+    # ------------------------------------------------------------------
+    # Live component state
+    # ------------------------------------------------------------------
+
+    def track_scheduler(self, scheduler):
+        """Queue depth, slots and admission outcomes of a RequestScheduler"""
+        r, ns = self.registry, self.namespace
+
+        def rejections():
+            stats = scheduler.stats()
+            return {('queue_full',): stats['rejected_queue_full'],
+                    ('overloaded',): stats['rejected_overloaded'],
+                    ('timed_out',): stats['timed_out']}
+
+        r.collect(f'{ns}_scheduler_queue_depth', 'Requests waiting for a backend slot',
+                  lambda: {(p,): n for p, n in scheduler.stats()['queue_depth'].items()},
+                  labels=('priority',))
+        r.collect(f'{ns}_scheduler_in_flight', 'Generations holding a backend slot',
+                  lambda: scheduler.in_flight)
+        r.collect(f'{ns}_scheduler_capacity', 'Backend slots (max generations in flight)',
+                  lambda: scheduler.max_in_flight)
+        r.collect(f'{ns}_scheduler_estimated_wait_seconds', 'Expected wait for a new request',
+                  scheduler.estimated_wait)
+        r.collect(f'{ns}_scheduler_admitted_total', 'Requests dispatched to a backend slot',
+                  lambda: scheduler.stats()['admitted'], kind='counter')
+        r.collect(f'{ns}_scheduler_rejected_total', 'Requests refused by admission control',
+                  rejections, kind='counter', labels=('reason',))
+
+    def track_cache(self, cache):
+        """Lookups and size of a ResponseCache"""
+        r, ns = self.registry, self.namespace
+
+        def lookups():
+            stats = cache.stats()
+            return {('memory_hit',): stats['memory_hits'], ('disk_hit',): stats['disk_hits'],
+                    ('miss',): stats['misses']}
+
+        def entries():
+            stats = cache.stats()
+            return {('memory',): stats['entries'], ('disk',): stats['disk_entries']}
+
+        def evictions():
+            stats = cache.stats()
+            return {('memory',): stats['evictions'], ('disk',): stats['disk_evictions']}
+
+        r.collect(f'{ns}_cache_lookups_total', 'Response cache lookups by outcome',
+                  lookups, kind='counter', labels=('result',))
+        r.collect(f'{ns}_cache_hit_ratio', 'Response cache hit rate since start',
+                  lambda: cache.stats()['hit_rate'])
+        r.collect(f'{ns}_cache_entries', 'Cached responses by tier', entries, labels=('tier',))
+        r.collect(f'{ns}_cache_evictions_total', 'Entries evicted from the response cache',
+                  evictions, kind='counter', labels=('tier',))
+
+    def track_coalescing(self, inflight):
+        """Leader/follower counts of a SingleFlight"""
+        def roles():
+            stats = inflight.stats()
+            return {('leader',): stats['leaders'], ('follower',): stats['coalesced']}
+
+        self.registry.collect(
+            f'{self.namespace}_coalesced_requests_total',
+            'Generations that started upstream (leader) or joined one in flight (follower)',
+            roles, kind='counter', labels=('role',))
+
+    def track_backends(self, pool):
+        """Health, load and breaker state of every backend in a BackendPool"""
+        r, ns = self.registry, self.namespace
+
+        def per_backend(field, transform=lambda value: value):
+            return lambda: {(s['url'],): transform(s[field]) for s in pool.status()}
+
+        r.collect(f'{ns}_backend_up', 'Backend passed its last health check',
+                  per_backend('healthy', int), labels=('backend',))
+        r.collect(f'{ns}_backend_outstanding_requests', 'Requests in flight per backend',
+                  per_backend('outstanding'), labels=('backend',))
+        r.collect(f'{ns}_backend_circuit_open', 'Backend circuit breaker open (1) or half open (0.5)',
+                  per_backend('circuit', lambda state: {'open': 1, 'half_open': 0.5}.get(state, 0)),
+                  labels=('backend',))
+        r.collect(f'{ns}_backend_latency_seconds', 'Moving average of backend request latency',
+                  per_backend('latency_ms', lambda ms: ms / 1000 if ms is not None else None),
+                  labels=('backend',))
+        r.collect(f'{ns}_backend_requests_total', 'Requests dispatched per backend',
+                  per_backend('requests'), kind='counter', labels=('backend',))
+        r.collect(f'{ns}_backend_failures_total', 'Failed requests per backend',
+                  per_backend('failures'), kind='counter', labels=('backend',))
+
+    def track_warm_pool(self, warm_pool):
+        """Residency and warm-up latency of a WarmPoolManager's models"""
+        r, ns = self.registry, self.namespace
+
+        def per_model(field):
+            def collect():
+                values = {}
+                for model, backends in warm_pool.status()['models'].items():
+                    for url, state in backends.items():
+                        report = state['last_warm'] or {}
+                        value = state['loaded'] if field == 'loaded' else report.get(field)
+                        if value is not None:
+                            values[(model, url)] = (int(value) if field == 'loaded' else value / 1000)
+                return values
+            return collect
+
+        r.collect(f'{ns}_model_loaded', 'Model resident in backend memory at the last check',
+                  per_model('loaded'), labels=('model', 'backend'))
+        r.collect(f'{ns}_model_cold_start_seconds', 'First request latency at the last warm-up',
+                  per_model('cold_ms'), labels=('model', 'backend'))
+        r.collect(f'{ns}_model_warm_latency_seconds', 'Resident-model request latency at the last warm-up',
+                  per_model('warm_ms'), labels=('model', 'backend'))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request counts and latency per endpoint
+
+    Endpoints are labelled with the matched route template (not the raw
+    path) to keep label cardinality bounded; unmatched paths share the
+    label 'unmatched'. Streaming responses are timed until the last body
+    chunk is sent.
+    """
+
+    def __init__(self, app, metrics: ServingMetrics, exclude: Iterable[str] = ('/metrics',)):
+        self.app = app
+        self.metrics = metrics
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {'code': 500}
+        endpoint = 'unmatched'
+        self.metrics.http_in_progress.inc()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.http_in_progress.dec()
+            route = scope.get('route')
+            if route is not None and getattr(route, 'path', None):
+                endpoint = route.path
+            method = scope['method']
+            self.metrics.http_requests.inc(method=method, endpoint=endpoint,
+                                           status=str(status['code']))
+            self.metrics.http_latency.observe(time.perf_counter() - start,
+                                              method=method, endpoint=endpoint)
@@ -0,0 +1,230 @@
+"""
+Request Scheduler
+Bounded, prioritized admission of generations in front of an Ollama backend
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+class SchedulerRejected(Exception):
+    """
+    Request refused by admission control
+
+    Attributes:
+        status_code: 429 when the queue is full, 503 when the expected (or
+            actual) wait exceeds the limit
+        retry_after: Suggested client back-off in seconds
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """HTTP headers carrying the retry hint"""
+        return {'Retry-After': str(max(1, math.ceil(self.retry_after)))}
+
+
+class RequestScheduler:
+    """
+    Admission control and dispatch for one Ollama backend
+
+    Requests take one of max_in_flight slots; the rest wait in a bounded
+    queue. Dispatch keeps the backend's parallel slots full (Ollama batches
+    concurrent requests internally via OLLAMA_NUM_PARALLEL) without letting
+    requests pile up until the 120 s client timeout.
+
+    Features:
+    - Two priority classes: interactive requests are always dispatched
+      before queued bulk requests
+    - Bounded queue (429 + Retry-After when full; bulk has its own,
+      smaller limit so batch jobs cannot crowd out users)
+    - Wait-time admission: requests whose estimated queue wait exceeds
+      max_wait are refused up front with 503, and requests still queued
+      after max_wait are dropped with 503
+    - Queue depth, wait time and service time statistics
+    """
+
+    def __init__(self, max_in_flight: int = 4, max_queue: int = 64,
+                 max_bulk_queue: Optional[int] = None, max_wait: float = 30.0,
+                 name: str = 'default'):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_bulk_queue = max_queue // 2 if max_bulk_queue is None else max_bulk_queue
+        self.max_wait = max_wait
+
+        self._in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self._service_time: Optional[float] = None  # EWMA of slot hold time (s)
+        self._waits: Deque[float] = deque(maxlen=1024)
+        self._stats = {
+            'admitted': 0,
+            'rejected_queue_full': 0,
+            'rejected_overloaded': 0,
+            'timed_out': 0,
+            'completed': 0,
+            'wait_seconds_total': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def submit(self, fn: Callable[[], Awaitable[Any]], priority: str = INTERACTIVE) -> Any:
+        """
+        Run fn() once a slot is available
+
+        Raises:
+            SchedulerRejected: If admission control refuses the request
+        """
+        async with self.slot(priority):
+            return await fn()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE) -> AsyncIterator[None]:
+        """
+        Hold one backend slot for the duration of the block (use for streams)
+
+        Raises:
+            SchedulerRejected: If admission control refuses the request
+        """
+        await self._acquire(priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._observe_service(time.monotonic() - start)
+            self._release()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depth(self, priority: Optional[str] = None) -> int:
+        """Requests waiting for a slot (one class or all)"""
+        if priority is not None:
+            return len(self._waiters[priority])
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def estimated_wait(self, ahead: Optional[int] = None) -> float:
+        """Expected seconds until a newly queued request is dispatched"""
+        if self._in_flight < self.max_in_flight and not self.queue_depth():
+            return 0.0
+        ahead = self.queue_depth() if ahead is None else ahead
+        service = self._service_time if self._service_time is not None else 1.0
+        return (ahead + 1) / self.max_in_flight * service
+
+    def stats(self) -> Dict:
+        """Queue depth, in-flight, admission and wait-time statistics"""
+        waits = sorted(self._waits)
+
+        def percentile(q):
+            return waits[int(q * (len(waits) - 1))] if waits else 0.0
+
+        return {
+            'name': self.name,
+            'in_flight': self._in_flight,
+            'max_in_flight': self.max_in_flight,
+            'queue_depth': {p: len(self._waiters[p]) for p in PRIORITIES},
+            'max_queue': self.max_queue,
+            **self._stats,
+            'wait_p50_seconds': percentile(0.5),
+            'wait_p95_seconds': percentile(0.95),
+            'wait_max_seconds': waits[-1] if waits else 0.0,
+            'service_time_seconds': self._service_time,
+            'estimated_wait_seconds': self.estimated_wait()
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _admit(self, priority: str):
+        """Admission control for a request that would have to queue"""
+        depth = self.queue_depth()
+        if priority == INTERACTIVE:
+            full = depth >= self.max_queue
+            ahead = len(self._waiters[INTERACTIVE])
+        else:
+            full = depth >= self.max_queue or len(self._waiters[BULK]) >= self.max_bulk_queue
+            ahead = depth
+        expected = self.estimated_wait(ahead)
+
+        if full:
+            self._stats['rejected_queue_full'] += 1
+            raise SchedulerRejected(429, f"{self.name}: queue full ({depth} waiting)", expected)
+        if expected > self.max_wait:
+            self._stats['rejected_overloaded'] += 1
+            raise SchedulerRejected(
+                503, f"{self.name}: expected wait {expected:.1f}s exceeds {self.max_wait:g}s",
+                expected
+            )
+
+    async def _acquire(self, priority: str):
+        if priority not in self._waiters:
+            raise ValueError(f"Unknown priority '{priority}' (use one of {PRIORITIES})")
+
+        if self._in_flight < self.max_in_flight and not self.queue_depth():
+            self._in_flight += 1
+            self._record_wait(0.0)
+            return
+
+        self._admit(priority)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(future)
+        enqueued = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self._waiters[priority].remove(future)
+                self._stats['timed_out'] += 1
+                raise SchedulerRejected(
+                    503, f"{self.name}: no slot within {self.max_wait:g}s", self.estimated_wait()
+                )
+            # The slot was handed over as the timeout fired: keep it
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # slot handed over to a caller that went away
+            else:
+                future.cancel()
+                self._waiters[priority].remove(future)
+            raise
+        self._record_wait(time.monotonic() - enqueued)
+
+    def _release(self):
+        """Hand the slot to the next waiter (interactive first) or free it"""
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self._in_flight -= 1
+
+    def _record_wait(self, seconds: float):
+        self._stats['admitted'] += 1
+        self._stats['wait_seconds_total'] += seconds
+        self._waits.append(seconds)
+
+    def _observe_service(self, seconds: float):
+        self._stats['completed'] += 1
+        if self._service_time is None:
+            self._service_time = seconds
+        else:
+            self._service_time = 0.8 * self._service_time + 0.2 * seconds
@@ -0,0 +1,164 @@
+"""
+Request Coalescing
+Single-flight deduplication of concurrent identical Ollama generations
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class _Broadcast:
+    """One upstream stream fanned out to any number of subscribers"""
+
+    def __init__(self, source: AsyncIterator[Any], on_finish: Callable[['_Broadcast'], None]):
+        self.items: List[Any] = []
+        self.done = False
+        self.closing = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Condition()
+        self._on_finish = on_finish
+        self._task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[Any]):
+        try:
+            async for item in source:
+                async with self._changed:
+                    self.items.append(item)
+                    self._changed.notify_all()
+        except asyncio.CancelledError:
+            self.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self._on_finish(self)
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """Replay everything produced so far, then follow the live stream"""
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(
+                        lambda: position < len(self.items) or self.done
+                    )
+                    pending = self.items[position:]
+                    finished = self.done
+                position += len(pending)
+                for item in pending:
+                    yield item
+                if finished and position >= len(self.items):
+                    break
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is listening any more: stop the upstream generation
+                self.closing = True
+                self._task.cancel()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key
+
+    The first caller for a key (the leader) starts the work; callers that
+    arrive while it is in flight wait for the same result instead of
+    starting their own. Results are not retained once the call finishes -
+    that is the response cache's job.
+
+    Features:
+    - do(): share one awaitable result (or exception) among all waiters
+    - stream(): fan one async stream out to every subscriber, replaying
+      chunks already produced to late joiners
+    - The shared work survives the leader being cancelled (client
+      disconnect) as long as other waiters remain; once every waiter or
+      subscriber has gone it is cancelled, freeing the backend slot
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._stats = {'leaders': 0, 'coalesced': 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key among concurrent callers
+
+        Returns:
+            (result, shared) - shared is True for callers that joined an
+            in-flight call instead of starting one
+
+        Cancelling the last waiter cancels fn() as well.
+        """
+        future = self._calls.get(key)
+        shared = future is not None
+        if shared:
+            self._stats['coalesced'] += 1
+        else:
+            self._stats['leaders'] += 1
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._finish_call(key, f))
+
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future), shared
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+                if not future.done():
+                    # Nobody is waiting any more: stop the upstream generation,
+                    # and let the next caller start afresh
+                    if self._calls.get(key) is future:
+                        del self._calls[key]
+                    future.cancel()
+
+    def stream(self, key: str, factory: Callable[[], AsyncIterator[Any]]) -> Tuple[AsyncIterator[Any], bool]:
+        """
+        Subscribe to the shared stream for key, starting factory() if none
+        is in flight
+
+        Returns:
+            (iterator, shared) - every subscriber receives the full sequence
+        """
+        broadcast = self._streams.get(key)
+        shared = broadcast is not None and not broadcast.closing
+        if shared:
+            self._stats['coalesced'] += 1
+        else:
+            self._stats['leaders'] += 1
+            broadcast = _Broadcast(factory(), lambda b: self._finish_stream(key, b))
+            self._streams[key] = broadcast
+        return broadcast.subscribe(), shared
+
+    def _finish_call(self, key: str, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # retrieved here even if every waiter went away
+
+    def _finish_stream(self, key: str, broadcast: _Broadcast):
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    def in_flight(self) -> int:
+        """Distinct calls and streams currently running"""
+        return len(self._calls) + len(self._streams)
+
+    def stats(self) -> Dict:
+        """Leader/coalesced counts"""
+        total = self._stats['leaders'] + self._stats['coalesced']
+        return {
+            **self._stats,
+            'coalesce_rate': self._stats['coalesced'] / total if total else 0.0,
+            'in_flight': self.in_flight()
+        }
@@ -0,0 +1,79 @@
+"""
+Token Streaming Helpers
+Latency tracking and Server-Sent Events framing for Ollama token streams
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+
+
+@dataclass
+class StreamTiming:
+    """
+    Latency record for one streamed generation
+
+    first_token_ms is measured from the start of the request to the first
+    non-empty token; total_ms to the final ('done') chunk. Generation
+    throughput comes from Ollama's own eval_count / eval_duration.
+    """
+    start: float = field(default_factory=time.perf_counter)
+    first_token: Optional[float] = None
+    end: Optional[float] = None
+    tokens: int = 0
+    eval_count: Optional[int] = None
+    eval_duration_ns: Optional[int] = None
+
+    @property
+    def first_token_ms(self) -> Optional[float]:
+        if self.first_token is None:
+            return None
+        return (self.first_token - self.start) * 1000
+
+    @property
+    def total_ms(self) -> Optional[float]:
+        if self.end is None:
+            return None
+        return (self.end - self.start) * 1000
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.eval_count or not self.eval_duration_ns:
+            return None
+        return self.eval_count / (self.eval_duration_ns / 1e9)
+
+    def as_dict(self) -> Dict:
+        def rounded(value):
+            return round(value, 1) if value is not None else None
+
+        return {
+            'first_token_ms': rounded(self.first_token_ms),
+            'total_ms': rounded(self.total_ms),
+            'tokens': self.tokens,
+            'eval_count': self.eval_count,
+            'tokens_per_second': rounded(self.tokens_per_second)
+        }
+
+
+async def timed_stream(chunks: AsyncIterator[Dict], timing: StreamTiming) -> AsyncIterator[Dict]:
+    """Pass Ollama chunks through while filling in `timing`"""
+    async for chunk in chunks:
+        if chunk.get('response'):
+            if timing.first_token is None:
+                timing.first_token = time.perf_counter()
+            timing.tokens += 1
+        if chunk.get('done'):
+            timing.end = time.perf_counter()
+            timing.eval_count = chunk.get('eval_count')
+            timing.eval_duration_ns = chunk.get('eval_duration')
+        yield chunk
+
+    if timing.end is None:
+        timing.end = time.perf_counter()
+
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
@@ -0,0 +1,195 @@
+"""
+Stub Ollama Server
+Local stand-in for the Ollama HTTP API, used by benchmarks and development
+"""
+
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Union
+
+DEFAULT_KEEP_ALIVE = 300.0  # Ollama unloads idle models after 5 minutes
+
+
+def keep_alive_seconds(value: Optional[Union[str, float]]) -> float:
+    """Ollama keep_alive ("5m", "1h30m", 300, -1) in seconds (inf = forever)"""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        return math.inf if value < 0 else float(value)
+    value = value.strip()
+    if re.fullmatch(r'-?\d+(\.\d+)?', value):
+        return keep_alive_seconds(float(value))
+    if value.startswith('-'):
+        return math.inf
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|s|m|h)', value)
+    if not parts:
+        raise ValueError(f"Invalid keep_alive: {value!r}")
+    return sum(float(n) * units[unit] for n, unit in parts)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # accept bursts of new connections
+
+
+class StubOllamaServer:
+    """
+    Minimal Ollama look-alike running in a background thread
+
+    Serves /api/generate (streaming NDJSON and non-streaming), /api/tags
+    and /api/ps with configurable latency: a fixed time to first token plus
+    a fixed delay per generated token. Models that are not resident pay
+    load_delay first and stay loaded for the request's keep_alive.
+    """
+
+    def __init__(self, models: Iterable[str] = ('CroweLogic-Pharma:latest',),
+                 host: str = '127.0.0.1', port: int = 0,
+                 first_token_delay: float = 0.05, token_delay: float = 0.005,
+                 n_tokens: int = 40, load_delay: float = 0.0):
+        self.models = list(models)
+        self.load_delay = load_delay
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.n_tokens = n_tokens
+        self.requests_served = 0
+        self.fail_status: Optional[int] = None  # set to e.g. 500 to simulate a faulty host
+
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, float] = {}  # model -> expiry (time.time())
+        self._server = _StubHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubOllamaServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubOllamaServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def loaded_models(self) -> Dict[str, float]:
+        """Resident models and their expiry times"""
+        now = time.time()
+        with self._lock:
+            self._loaded = {m: t for m, t in self._loaded.items() if t > now}
+            return dict(self._loaded)
+
+    def _load(self, model: str, keep_alive) -> float:
+        """Make model resident; returns the load time paid (0 if warm)"""
+        load_time = 0.0 if model in self.loaded_models() else self.load_delay
+        if load_time:
+            time.sleep(load_time)
+        with self._lock:
+            self._loaded[model] = time.time() + keep_alive_seconds(keep_alive)
+        return load_time
+
+    def _tokens(self, prompt: str):
+        words = (prompt.split() or ['ok'])
+        return [f"{words[i % len(words)]} " for i in range(self.n_tokens)]
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == '/api/tags':
+                    self._send_json(200, {'models': [{'name': m, 'model': m} for m in stub.models]})
+                elif self.path == '/api/ps':
+                    self._send_json(200, {'models': [
+                        {'name': m, 'model': m,
+                         'expires_at': '2318-01-01T00:00:00Z' if math.isinf(t) else
+                         time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(t))}
+                        for m, t in stub.loaded_models().items()
+                    ]})
+                elif self.path == '/':
+                    self._send_json(200, {'status': 'Ollama is running'})
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+
+                if self.path != '/api/generate':
+                    self._send_json(404, {'error': 'not found'})
+                    return
+                if stub.fail_status is not None:
+                    self._send_json(stub.fail_status, {'error': 'simulated failure'})
+                    return
+                if request.get('model') not in stub.models:
+                    self._send_json(404, {'error': f"model '{request.get('model')}' not found"})
+                    return
+
+                with stub._lock:
+                    stub.requests_served += 1
+
+                start = time.perf_counter()
+                load_time = stub._load(request['model'], request.get('keep_alive'))
+                tokens = stub._tokens(request.get('prompt', ''))
+                n_predict = request.get('options', {}).get('num_predict')
+                if n_predict is not None and n_predict >= 0:
+                    tokens = tokens[:n_predict]
+                time.sleep(stub.first_token_delay)
+
+                def final_stats():
+                    elapsed_ns = int((time.perf_counter() - start) * 1e9)
+                    return {
+                        'model': request['model'],
+                        'done': True,
+                        'total_duration': elapsed_ns,
+                        'load_duration': int(load_time * 1e9),
+                        'eval_count': len(tokens),
+                        'eval_duration': max(1, int(len(tokens) * stub.token_delay * 1e9))
+                    }
+
+                if not request.get('stream', True):
+                    time.sleep(stub.token_delay * len(tokens))
+                    self._send_json(200, {'response': ''.join(tokens), **final_stats()})
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for token in tokens:
+                    line = {'model': request['model'], 'response': token, 'done': False}
+                    self._write_chunk((json.dumps(line) + '\n').encode('utf-8'))
+                    time.sleep(stub.token_delay)
+                self._write_chunk((json.dumps({'response': '', **final_stats()}) + '\n').encode('utf-8'))
+                self._write_chunk(b'')
+
+        return Handler
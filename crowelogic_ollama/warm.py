@@ -0,0 +1,192 @@
+"""
+Model Warm Pool
+Keeps configured models resident on their Ollama backends
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+from .backends import Backend, BalancedOllamaClient, normalize_model
+from .client import OllamaError
+
+logger = logging.getLogger(__name__)
+
+WARM_PROMPT = "Hi"
+
+
+def parse_keep_alive(value: Optional[str]) -> Optional[Union[str, float]]:
+    """
+    keep_alive from configuration text
+
+    Ollama reads JSON numbers as seconds (negative = keep loaded) but
+    requires a unit on strings, so "-1" must be sent as the number -1.
+    """
+    if value is None or not str(value).strip():
+        return None
+    value = str(value).strip()
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+class WarmPoolManager:
+    """
+    Pins models in backend memory and pre-warms them
+
+    Ollama unloads a model after 5 idle minutes (or when another request
+    sets a shorter keep_alive), and the next request pays the full load -
+    tens of seconds for the 70b/120b variants.
+
+    Features:
+    - Pins models with keep_alive (pair with a client whose default
+      keep_alive matches, so regular traffic keeps the pin)
+    - Pre-warms every backend serving a model with a one-token generation
+    - Tracks load state per backend from /api/ps and re-warms models that
+      were evicted (backend restart, memory pressure)
+    - Cold-start vs. warm latency per backend and model
+    """
+
+    def __init__(self, client: BalancedOllamaClient, models: Iterable[str],
+                 keep_alive: Optional[Union[str, float]] = -1, refresh_interval: float = 60.0,
+                 load_timeout: float = 600.0):
+        """
+        Args:
+            client: Balanced client whose pool holds the backends to warm
+            models: Models to keep resident
+            keep_alive: Residency requested from Ollama (-1 = until unloaded,
+                None = Ollama's default)
+            refresh_interval: Seconds between load-state checks in run()
+            load_timeout: Timeout for a warm-up request (includes model load)
+        """
+        self.client = client
+        self.pool = client.pool
+        self.models = [normalize_model(m) for m in models]
+        self.keep_alive = keep_alive
+        self.refresh_interval = refresh_interval
+        self.load_timeout = load_timeout
+
+        # backend url -> model -> load state
+        self.state: Dict[str, Dict[str, Dict]] = {}
+        self.reports: Dict[str, Dict[str, Dict]] = {}
+
+    def _targets(self, models: Optional[Iterable[str]] = None) -> List[tuple]:
+        """(backend, model) pairs to keep warm: healthy backends serving the model"""
+        models = [normalize_model(m) for m in models] if models else self.models
+        return [
+            (backend, model)
+            for model in models
+            for backend in self.pool.backends
+            if backend.healthy and backend.models and model in backend.models
+            and backend.serves(model)
+        ]
+
+    async def _timed_generate(self, backend: Backend, model: str) -> tuple:
+        start = time.perf_counter()
+        result = await self.client.client_for(backend).generate(
+            model, WARM_PROMPT, options={"num_predict": 1},
+            timeout=self.load_timeout, keep_alive=self.keep_alive
+        )
+        return (time.perf_counter() - start) * 1000, result
+
+    async def warm_backend(self, backend: Backend, model: str) -> Dict:
+        """
+        Load and pin model on one backend, measuring cold and warm latency
+
+        Returns:
+            Report with was_loaded (resident before warming), cold_ms (first
+            request, including any load), load_ms (load time reported by
+            Ollama) and warm_ms (second request, model resident)
+        """
+        report = {'backend': backend.url, 'model': model, 'warmed_at': time.time()}
+        try:
+            loaded = await self.refresh_backend(backend)
+            report['was_loaded'] = model in loaded
+            report['cold_ms'], result = await self._timed_generate(backend, model)
+            report['load_ms'] = round(result.get('load_duration', 0) / 1e6, 1)
+            report['warm_ms'], _ = await self._timed_generate(backend, model)
+            report['cold_ms'] = round(report['cold_ms'], 1)
+            report['warm_ms'] = round(report['warm_ms'], 1)
+            await self.refresh_backend(backend)
+        except OllamaError as e:
+            report['error'] = str(e)
+            logger.warning(f"Warm-up of {model} on {backend.url} failed: {e}")
+        self.reports.setdefault(backend.url, {})[model] = report
+        return report
+
+    async def warm(self, models: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Pre-warm models on every backend serving them (backends in parallel)"""
+        by_backend: Dict[str, List[tuple]] = {}
+        for backend, model in self._targets(models):
+            by_backend.setdefault(backend.url, []).append((backend, model))
+
+        async def warm_sequentially(pairs):
+            # One model at a time per backend: loading two at once would
+            # only contend for the same GPU memory bandwidth
+            return [await self.warm_backend(backend, model) for backend, model in pairs]
+
+        results = await asyncio.gather(*(warm_sequentially(p) for p in by_backend.values()))
+        return [report for reports in results for report in reports]
+
+    async def refresh_backend(self, backend: Backend) -> Dict[str, Dict]:
+        """Read one backend's resident models (/api/ps)"""
+        ps = await self.client.client_for(backend).ps()
+        loaded = {
+            normalize_model(m.get('name') or m.get('model')): {
+                'expires_at': m.get('expires_at'),
+                'size_vram': m.get('size_vram')
+            }
+            for m in ps.get('models', [])
+        }
+        self.state[backend.url] = loaded
+        return loaded
+
+    async def refresh(self):
+        """Update load state for every healthy backend"""
+        backends = [b for b in self.pool.backends if b.healthy]
+        results = await asyncio.gather(*(self.refresh_backend(b) for b in backends),
+                                       return_exceptions=True)
+        for backend, result in zip(backends, results):
+            if isinstance(result, Exception):
+                self.state.pop(backend.url, None)
+
+    async def run(self):
+        """Pre-warm, then re-warm evicted models every refresh_interval (run as a task)"""
+        await self.warm()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+                for backend, model in self._targets():
+                    if model not in self.state.get(backend.url, {}):
+                        logger.info(f"{model} is not resident on {backend.url}; re-warming")
+                        await self.warm_backend(backend, model)
+            except Exception as e:
+                logger.error(f"Warm pool refresh failed: {e}")
+
+    def is_loaded(self, model: str, backend: Optional[Backend] = None) -> bool:
+        """Whether model was resident (on backend, or anywhere) at the last check"""
+        model = normalize_model(model)
+        if backend is not None:
+            return model in self.state.get(backend.url, {})
+        return any(model in loaded for loaded in self.state.values())
+
+    def status(self) -> Dict:
+        """Load state and latest warm-up report per model and backend"""
+        return {
+            'keep_alive': self.keep_alive,
+            'models': {
+                model: {
+                    backend.url: {
+                        'loaded': self.is_loaded(model, backend),
+                        **self.state.get(backend.url, {}).get(model, {}),
+                        'last_warm': self.reports.get(backend.url, {}).get(model)
+                    }
+                    for backend in self.pool.backends if backend.serves(model)
+                }
+                for model in self.models
+            }
+        }
@@ -86,34 +86,125 @@ def model():
     pass
 
 
+def _backend_pool():
+    """
+    Health-checked pool of Ollama hosts
+
+    OLLAMA_BACKENDS (or the ollama_hosts setting, e.g.
+    "http://gpu1:11434,http://gpu2:11434=CroweLogic-Pharma:pro") lists
+    several hosts; otherwise ollama_host is used alone.
+    """
+    from crowelogic_ollama import BackendPool
+
+    spec = os.getenv('OLLAMA_BACKENDS') or config.get('ollama_hosts') or config.get('ollama_host')
+    pool = BackendPool.from_spec(spec)
+    pool.check_all_sync()
+    return pool
+
+
 @model.command('chat')
 @click.option('--model', '-m', default=None, help='Model to use')
 @click.option('--query', '-q', help='Direct query (non-interactive)')
 def model_chat(model, query):
     """Interactive chat with CroweLogic-Pharma AI"""
+    import asyncio
+    from crowelogic_ollama import BalancedOllamaClient, OllamaError, parse_keep_alive
+
     model_name = model or config.get('default_model')
+    pool = _backend_pool()
 
     console.print(Panel(f"[bold cyan]CroweLogic-Pharma AI Chat[/bold cyan]\nModel: {model_name}",
                        border_style="cyan"))
 
     if query:
         # Direct query mode
-        import requests
+        async def ask():
+            keep_alive = parse_keep_alive(config.get('keep_alive'))
+            async with BalancedOllamaClient(pool, keep_alive=keep_alive) as client:
+                return await client.generate(model_name, query)
 
         with console.status("[bold green]Querying model..."):
             try:
-                response = requests.post(
-                    f"{config.get('ollama_host')}/api/generate",
-                    json={'model': model_name, 'prompt': query, 'stream': False}
-                )
-                result = response.json()
+                result = asyncio.run(ask())
                 console.print(f"\n[bold green]Response:[/bold green]\n{result['response']}\n")
-            except Exception as e:
+            except OllamaError as e:
                 console.print(f"[bold red]Error:[/bold red] {e}")
     else:
-        # Interactive mode
+        # Interactive mode (on the least loaded healthy host serving the model)
         import subprocess
-        subprocess.run(['ollama', 'run', model_name])
+        try:
+            backend = pool.select(model_name)
+        except OllamaError as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+            return
+        subprocess.run(['ollama', 'run', model_name], env={**os.environ, 'OLLAMA_HOST': backend.url})
+
+
+@model.command('backends')
+def model_backends():
+    """Show Ollama hosts, their health and the models they serve"""
+    pool = _backend_pool()
+
+    table = Table(title="Ollama Backends", show_header=True)
+    table.add_column("Host", style="cyan")
+    table.add_column("Health")
+    table.add_column("Breaker")
+    table.add_column("Latency", justify="right")
+    table.add_column("Models")
+
+    for status in pool.status():
+        health = "[green]healthy[/green]" if status['healthy'] else f"[red]down[/red] {status['last_error'] or ''}"
+        latency = f"{status['latency_ms']:.0f} ms" if status['latency_ms'] is not None else "-"
+        models = status['allowed_models'] or status['models'] or []
+        table.add_row(status['url'], health, status['circuit'], latency, ", ".join(models))
+
+    console.print(table)
+
+
+@model.command('warm')
+@click.option('--model', '-m', 'models', multiple=True, help='Model to warm (repeatable)')
+@click.option('--keep-alive', default=None,
+              help='How long Ollama keeps the model loaded, e.g. 30m or -1 (forever)')
+def model_warm(models, keep_alive):
+    """Load and pin models on every Ollama host, reporting cold vs. warm latency"""
+    import asyncio
+    from crowelogic_ollama import BalancedOllamaClient, WarmPoolManager, parse_keep_alive
+
+    models = list(models) or [config.get('default_model')]
+    keep_alive = parse_keep_alive(keep_alive or config.get('keep_alive') or '-1')
+    pool = _backend_pool()
+
+    async def warm():
+        async with BalancedOllamaClient(pool) as client:
+            return await WarmPoolManager(client, models, keep_alive=keep_alive).warm()
+
+    with console.status(f"[bold green]Warming {', '.join(models)} (keep_alive={keep_alive})..."):
+        reports = asyncio.run(warm())
+
+    if not reports:
+        console.print(f"[bold red]No healthy host serves {', '.join(models)}[/bold red] "
+                      f"(see 'model backends')")
+        return
+
+    table = Table(title="Model Warm-up", show_header=True)
+    table.add_column("Model", style="cyan")
+    table.add_column("Host")
+    table.add_column("Was Loaded")
+    table.add_column("Cold Start", justify="right")
+    table.add_column("Model Load", justify="right")
+    table.add_column("Warm", justify="right")
+
+    for report in reports:
+        if 'error' in report:
+            table.add_row(report['model'], report['backend'], "-",
+                          f"[red]{report['error']}[/red]", "", "")
+            continue
+        table.add_row(
+            report['model'], report['backend'], "yes" if report['was_loaded'] else "no",
+            f"{report['cold_ms']:.0f} ms", f"{report['load_ms']:.0f} ms", f"{report['warm_ms']:.0f} ms"
+        )
+
+    console.print(table)
 
 
 @model.command('list')
@@ -4,10 +4,18 @@ Add ChEMBL Drug Target Knowledge to CroweLogic-Pharma
 Processes 17,803 ChEMBL targets and creates training examples
 """
 
+import argparse
 import json
 import os
 from pathlib import Path
 
+from jsonl_ingest import IngestReport, loads
+from reservoir import sample_jsonl
+
+def has_target_info(target_data):
+    """Whether process_target can build an example (components and a name)"""
+    return bool(target_data.get('target_components')) and bool(target_data.get('pref_name'))
+
 class ChEMBLIntegrator:
     def __init__(self, chembl_file="../../Downloads/chembl_targets_all.jsonl"):
         self.chembl_file = chembl_file
@@ -99,35 +107,35 @@ class ChEMBLIntegrator:
             print(f"Error processing target: {e}")
             return None
 
-    def sample_targets(self, n_samples=200):
-        """Sample diverse targets for training"""
-        print(f"Reading ChEMBL targets from {self.chembl_file}...")
-
-        target_types = {}
-        total_count = 0
+    def sample_targets(self, n_samples=200, seed=None, workers=None):
+        """
+        Sample diverse targets for training
 
-        with open(self.chembl_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    total_count += 1
-                    target_data = json.loads(line)
-                    target_type = target_data.get('target_type', 'UNKNOWN')
+        One pass over the ChEMBL dump keeps a uniform reservoir of usable
+        targets per target_type; n_samples is then split evenly across types
+        (types with too few targets hand their share to the others). Only the
+        targets finally kept go through process_target.
 
-                    if target_type not in target_types:
-                        target_types[target_type] = []
-
-                    if len(target_types[target_type]) < n_samples // len(target_types):
-                        example = self.process_target(target_data)
-                        if example:
-                            target_types[target_type].append(example)
+        Args:
+            n_samples: Training examples to create
+            seed: Random seed for a reproducible sample
+            workers: Processes reading shards of the dump (default: CPU count)
+        """
+        print(f"Reading ChEMBL targets from {self.chembl_file}...")
 
-                    if total_count % 1000 == 0:
-                        print(f"  Processed {total_count} targets...")
+        report = IngestReport(self.chembl_file)
+        reservoir = sample_jsonl(self.chembl_file, key_field='target_type', capacity=n_samples,
+                                 seed=seed, accept=has_target_info, workers=workers,
+                                 report=report)
+        target_types = reservoir.select(
+            n_samples, process=lambda line: self.process_target(loads(line))
+        )
 
-        print(f"\nTotal targets in database: {total_count}")
+        print(f"\nTotal targets in database: {report.records} ({report.summary()})")
+        print(f"Targets with components and a name: {reservoir.total}")
         print(f"\nTargets by type:")
         for ttype, examples in target_types.items():
-            print(f"  {ttype}: {len(examples)} sampled")
+            print(f"  {ttype}: {len(examples)} sampled of {reservoir.counts[ttype]}")
             self.training_examples.extend(examples)
 
         return self.training_examples
@@ -573,13 +581,42 @@ This systematic approach accelerates natural product drug discovery by leveragin
         return output_path
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Add ChEMBL drug target knowledge to CroweLogic-Pharma"
+    )
+    parser.add_argument(
+        "--chembl-file",
+        default="../../Downloads/chembl_targets_all.jsonl",
+        help="ChEMBL targets dump (JSONL)"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=200,
+        help="Target examples to sample, split evenly across target types (default: 200)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed for target sampling (default: 42)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes reading the ChEMBL dump (default: CPU count)"
+    )
+
+    args = parser.parse_args()
+
     print("=== ChEMBL Integration for CroweLogic-Pharma ===\n")
 
-    integrator = ChEMBLIntegrator()
+    integrator = ChEMBLIntegrator(chembl_file=args.chembl_file)
 
     # Sample diverse targets from ChEMBL
     print("Step 1: Sampling drug targets from ChEMBL database...")
-    integrator.sample_targets(n_samples=200)
+    integrator.sample_targets(n_samples=args.samples, seed=args.seed, workers=args.workers)
 
     # Create bioactivity interpretation examples
     print("\nStep 2: Creating bioactivity interpretation examples...")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+JSONL Ingestion Benchmark
+Parse throughput (MB/s) of the previous line-by-line json.loads loop vs. the
+shared jsonl_ingest reader, and random sampling by re-reading the file vs.
+the IndexedJSONL offset index, on a synthetic training corpus
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from functools import partial
+
+from jsonl_ingest import JSON_BACKEND, IndexedJSONL, IngestReport, iter_jsonl
+from consolidate_training_data import normalize_entry
+
+WORDS = ("mycelium substrate hericenone erinacine ganoderic acid kinase inhibitor receptor "
+         "binding affinity neuroprotective pathway clinical trial dosage bioavailability "
+         "temperature humidity colonization fruiting polysaccharide beta-glucan").split()
+
+
+def write_corpus(path, size_mb, seed=0):
+    """Synthetic prompt/response JSONL of about size_mb megabytes"""
+    rng = random.Random(seed)
+    target = size_mb * 1_000_000
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            example = {
+                "prompt": " ".join(rng.choices(WORDS, k=rng.randint(8, 30))) + "?",
+                "response": " ".join(rng.choices(WORDS, k=rng.randint(80, 300))),
+                "source": rng.choice(["pharma_base", "chembl", "huggingface"]),
+                "category": rng.choice(["drug_targets", "cultivation_qa", "general"])
+            }
+            line = json.dumps(example, ensure_ascii=False) + "\n"
+            f.write(line)
+            written += len(line.encode('utf-8'))
+
+
+def stdlib_loop(path):
+    """The previous loaders: text mode, one json.loads per line, one thread"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return len(records)
+
+
+def timed(label, path, fn):
+    size = os.path.getsize(path) / 1e6
+    start = time.perf_counter()
+    count = fn()
+    seconds = time.perf_counter() - start
+    print(f"   {label:<44} {count:>9,} records  {seconds:6.2f}s  {size / seconds:7.0f} MB/s")
+    return seconds
+
+
+def main(size_mb=200, workers=None):
+    workers = workers or os.cpu_count() or 1
+    n_workers = f"{workers} worker{'s' if workers != 1 else ''}"
+
+    print("\n" + "="*80)
+    print("JSONL INGESTION BENCHMARK")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.jsonl")
+        write_corpus(path, size_mb)
+        print(f"\n   Corpus: {os.path.getsize(path) / 1e6:.0f} MB   JSON backend: {JSON_BACKEND}   "
+              f"CPUs: {os.cpu_count()}\n")
+
+        def ingest(n, transform=None):
+            report = IngestReport(path)
+            for _ in iter_jsonl(path, transform=transform, workers=n, report=report):
+                pass
+            return report.records
+
+        normalize = partial(normalize_entry, source_name="benchmark")
+        baseline = timed("json.loads per line (previous)", path, lambda: stdlib_loop(path))
+        single = timed("iter_jsonl, 1 worker", path, lambda: ingest(1))
+        parallel = timed(f"iter_jsonl, {n_workers}", path, lambda: ingest(workers))
+        timed(f"iter_jsonl + normalize, {n_workers}", path,
+              lambda: ingest(workers, normalize))
+
+        print(f"\n   Speedup vs. previous: {baseline / single:.1f}x (1 worker), "
+              f"{baseline / parallel:.1f}x ({n_workers})")
+
+        print("\n   Random sample of 1,000 records:\n")
+
+        def reread_sample():
+            with open(path, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            return len(random.Random(0).sample(records, 1000))
+
+        def indexed_sample():
+            with IndexedJSONL(path) as data:
+                return len(data.sample(1000, seed=0))
+
+        timed("re-read whole file (previous)", path, reread_sample)
+        timed("IndexedJSONL, building the index", path, indexed_sample)
+        timed("IndexedJSONL, index already built", path, indexed_sample)
+
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
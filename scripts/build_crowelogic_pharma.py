@@ -9,6 +9,8 @@ import csv
 import os
 from pathlib import Path
 
+from jsonl_ingest import IngestReport, iter_jsonl
+
 class CroweLogicPharmaBuilder:
     def __init__(self):
         self.training_data = []
@@ -36,26 +38,24 @@ class CroweLogicPharmaBuilder:
         """Load expert mushroom cultivation training data"""
         print(f"Loading expert training data from {file_path}...")
         count = 0
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    entry = json.loads(line)
-                    if 'messages' in entry:
-                        messages = entry['messages']
-                        user_msg = next((m['content'] for m in messages if m['role'] == 'user'), None)
-                        asst_msg = next((m['content'] for m in messages if m['role'] == 'assistant'), None)
-
-                        if user_msg and asst_msg and len(asst_msg) > 100:
-                            self.training_data.append({
-                                "prompt": user_msg,
-                                "response": asst_msg[:500],  # Limit response length
-                                "source": "crowelm_expert",
-                                "category": "cultivation_expertise"
-                            })
-                            count += 1
-                            if count >= 50:  # Limit to 50 examples
-                                break
-        print(f"  Added {count} expert cultivation examples")
+        report = IngestReport(str(file_path))
+        for entry in iter_jsonl(file_path, report=report):
+            if 'messages' in entry:
+                messages = entry['messages']
+                user_msg = next((m['content'] for m in messages if m['role'] == 'user'), None)
+                asst_msg = next((m['content'] for m in messages if m['role'] == 'assistant'), None)
+
+                if user_msg and asst_msg and len(asst_msg) > 100:
+                    self.training_data.append({
+                        "prompt": user_msg,
+                        "response": asst_msg[:500],  # Limit response length
+                        "source": "crowelm_expert",
+                        "category": "cultivation_expertise"
+                    })
+                    count += 1
+                    if count >= 50:  # Limit to 50 examples
+                        break
+        print(f"  Added {count} expert cultivation examples ({report.summary()})")
 
     def load_csv_training(self, file_path):
         """Load CSV training data"""
@@ -78,19 +78,17 @@ class CroweLogicPharmaBuilder:
         """Load pharmaceutical domain training data"""
         print(f"Loading pharmaceutical training data from {file_path}...")
         count = 0
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    entry = json.loads(line)
-                    if 'prompt' in entry and 'response' in entry:
-                        self.training_data.append({
-                            "prompt": entry['prompt'],
-                            "response": entry['response'],
-                            "source": "pharma_training",
-                            "category": "pharmaceutical_expertise"
-                        })
-                        count += 1
-        print(f"  Added {count} pharmaceutical expertise examples")
+        report = IngestReport(str(file_path))
+        for entry in iter_jsonl(file_path, report=report):
+            if 'prompt' in entry and 'response' in entry:
+                self.training_data.append({
+                    "prompt": entry['prompt'],
+                    "response": entry['response'],
+                    "source": "pharma_training",
+                    "category": "pharmaceutical_expertise"
+                })
+                count += 1
+        print(f"  Added {count} pharmaceutical expertise examples ({report.summary()})")
 
     def create_hybrid_examples(self):
         """Create hybrid examples connecting mushroom compounds to pharmaceutical applications"""
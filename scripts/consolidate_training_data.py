@@ -4,14 +4,76 @@ Consolidated Training Data Pipeline for CroweLogic-Pharma
 Combines all data sources: mushroom knowledge, pharma, ChEMBL, and Hugging Face datasets
 """
 
+import argparse
+import hashlib
 import json
 import os
+from functools import partial
+from itertools import chain
 from pathlib import Path
 from collections import Counter
 
+from jsonl_ingest import IngestReport, iter_jsonl
+from near_dedup import NearDuplicateFilter
+
+# Input files in load order: (file name, default source name)
+EXISTING_SOURCES = [
+    ("pharma_base.jsonl", "pharma_base"),
+    ("crowelm_expert.jsonl", "mushroom_expert"),
+    ("crowelogic_pharma_complete_training.jsonl", "complete_training"),
+]
+NEW_SOURCES = [
+    ("chembl_training_data.jsonl", "chembl"),
+    ("huggingface_training_data.jsonl", "huggingface"),
+]
+
+def normalize_entry(entry, source_name):
+    """Standard example format, or None without a prompt and response"""
+    if not isinstance(entry, dict):
+        return None
+    example = {
+        "prompt": entry.get('prompt', ''),
+        "response": entry.get('response', entry.get('completion', '')),
+        "source": entry.get('source', source_name),
+        "category": entry.get('category', 'general')
+    }
+    return example if example['prompt'] and example['response'] else None
+
 class TrainingDataConsolidator:
-    def __init__(self):
-        self.all_training_data = []
+    """
+    Streaming consolidation of all training data sources
+
+    Every stage is a generator, so examples flow one at a time from the
+    input files to the output writers in a single pass:
+
+        load -> normalize -> dedup -> near-dedup -> validate -> stats -> writers
+
+    Memory does not grow with the corpus, except for the dedup indexes: one
+    8-byte digest per unique prompt (exact) and one MinHash signature per
+    kept example (near-duplicate), rather than the examples themselves.
+    """
+
+    def __init__(self, training_dir="training_data", max_reported_issues=10,
+                 near_dup_threshold=0.85, num_perm=128, workers=None):
+        """
+        Args:
+            training_dir: Directory holding the input and output files
+            max_reported_issues: Sample size for duplicate/quality reports
+            near_dup_threshold: Jaccard similarity of prompt+response at or
+                above which an example is a near-duplicate (None disables)
+            num_perm: MinHash signature length
+            workers: Processes parsing input files and computing MinHash
+                signatures (default: CPU count)
+        """
+        self.training_dir = Path(training_dir)
+        self.max_reported_issues = max_reported_issues
+        self.near_dup_threshold = near_dup_threshold
+        self.num_perm = num_perm
+        self.workers = workers
+        self.all_training_data = []  # used only by the list-based helpers
+        self._reset_stats()
+
+    def _reset_stats(self):
         self.stats = {
             'total_examples': 0,
             'by_source': Counter(),
@@ -19,220 +81,290 @@ class TrainingDataConsolidator:
             'avg_prompt_length': 0,
             'avg_response_length': 0
         }
-
-    def load_jsonl_file(self, file_path, source_name):
-        """Load training data from JSONL file"""
+        self.load_stats = {}  # source -> IngestReport
+        self.dedup_stats = {'seen': 0, 'duplicates': 0, 'examples': []}
+        self.near_dedup = None
+        self.quality = {'issues': Counter(), 'examples': []}
+        self._length_totals = {'prompt': 0, 'response': 0}
+
+    # ------------------------------------------------------------------
+    # Streaming stages
+    # ------------------------------------------------------------------
+
+    def iter_jsonl_file(self, file_path, source_name):
+        """Yield standardized examples from a JSONL file (load + normalize)"""
         if not os.path.exists(file_path):
             print(f"  ⚠ File not found: {file_path}")
-            return []
+            return
 
-        examples = []
+        report = self.load_stats[source_name] = IngestReport(str(file_path))
         print(f"  Loading {file_path}...")
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                if line.strip():
-                    try:
-                        entry = json.loads(line)
-                        # Standardize format
-                        example = {
-                            "prompt": entry.get('prompt', ''),
-                            "response": entry.get('response', entry.get('completion', '')),
-                            "source": entry.get('source', source_name),
-                            "category": entry.get('category', 'general')
-                        }
-
-                        if example['prompt'] and example['response']:
-                            examples.append(example)
-                            self.stats['by_source'][example['source']] += 1
-                            self.stats['by_category'][example['category']] += 1
-                        else:
-                            print(f"    ⚠ Skipping line {line_num}: missing prompt or response")
-
-                    except json.JSONDecodeError as e:
-                        print(f"    ⚠ JSON error on line {line_num}: {e}")
-
-        print(f"    Loaded {len(examples)} examples from {source_name}")
-        return examples
+        yield from iter_jsonl(file_path, transform=partial(normalize_entry, source_name=source_name),
+                              workers=self.workers, report=report,
+                              max_errors=self.max_reported_issues)
 
-    def load_existing_training_data(self):
-        """Load all existing training data files"""
-        print("\n=== Loading Existing Training Data ===\n")
+        print(f"    Loaded {report.records} examples from {source_name}: {report.summary()}")
+        if report.filtered:
+            print(f"    ⚠ Skipped {report.filtered} lines missing prompt or response")
+        for line_num, message in report.errors[1:]:
+            print(f"    ⚠ Malformed JSON at line {line_num}: {message}")
 
-        training_dir = Path("training_data")
-
-        # Load base pharmaceutical training
-        pharma_examples = self.load_jsonl_file(
-            training_dir / "pharma_base.jsonl",
-            "pharma_base"
-        )
-        self.all_training_data.extend(pharma_examples)
-
-        # Load mushroom expert knowledge
-        mushroom_examples = self.load_jsonl_file(
-            training_dir / "crowelm_expert.jsonl",
-            "mushroom_expert"
-        )
-        self.all_training_data.extend(mushroom_examples)
-
-        # Load complete training (if exists)
-        complete_examples = self.load_jsonl_file(
-            training_dir / "crowelogic_pharma_complete_training.jsonl",
-            "complete_training"
-        )
-        # Only add if not duplicate
-        existing_prompts = {ex['prompt'] for ex in self.all_training_data}
-        new_complete = [ex for ex in complete_examples if ex['prompt'] not in existing_prompts]
-        self.all_training_data.extend(new_complete)
-
-        print(f"\n  Total existing examples loaded: {len(self.all_training_data)}")
-
-    def load_new_datasets(self):
-        """Load newly generated dataset files"""
-        print("\n=== Loading New Dataset Integrations ===\n")
-
-        training_dir = Path("training_data")
+    def load_jsonl_file(self, file_path, source_name):
+        """Load training data from JSONL file"""
+        return list(self.iter_jsonl_file(file_path, source_name))
 
-        # Load ChEMBL training data
-        chembl_examples = self.load_jsonl_file(
-            training_dir / "chembl_training_data.jsonl",
-            "chembl"
+    def iter_sources(self, sources=None):
+        """All input files, in load order, as one example stream"""
+        sources = sources if sources is not None else EXISTING_SOURCES + NEW_SOURCES
+        return chain.from_iterable(
+            self.iter_jsonl_file(self.training_dir / name, source) for name, source in sources
         )
-        self.all_training_data.extend(chembl_examples)
 
-        # Load Hugging Face dataset integrations
-        hf_examples = self.load_jsonl_file(
-            training_dir / "huggingface_training_data.jsonl",
-            "huggingface"
+    @staticmethod
+    def prompt_digest(prompt):
+        """64-bit digest of the normalized prompt (dedup key)"""
+        digest = hashlib.blake2b(prompt.strip().lower().encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def dedup_stage(self, examples):
+        """Drop examples whose prompt (case/whitespace-insensitive) was already seen"""
+        seen = set()
+        for example in examples:
+            self.dedup_stats['seen'] += 1
+            key = self.prompt_digest(example['prompt'])
+            if key in seen:
+                self.dedup_stats['duplicates'] += 1
+                if len(self.dedup_stats['examples']) < self.max_reported_issues:
+                    self.dedup_stats['examples'].append(example['prompt'][:80])
+                continue
+            seen.add(key)
+            yield example
+
+    def near_dedup_stage(self, examples):
+        """Drop examples whose prompt+response is a near-duplicate of an earlier one"""
+        if self.near_dup_threshold is None:
+            yield from examples
+            return
+        self.near_dedup = NearDuplicateFilter(
+            threshold=self.near_dup_threshold, num_perm=self.num_perm, workers=self.workers
         )
-        self.all_training_data.extend(hf_examples)
+        yield from self.near_dedup.filter(examples)
 
-        print(f"\n  Total with new datasets: {len(self.all_training_data)}")
+    def _issue(self, kind, index):
+        self.quality['issues'][kind] += 1
+        if len(self.quality['examples']) < self.max_reported_issues:
+            self.quality['examples'].append(f"Example {index}: {kind}")
 
-    def deduplicate(self):
-        """Remove duplicate examples based on prompt"""
-        print("\n=== Deduplicating Training Data ===\n")
-
-        initial_count = len(self.all_training_data)
-        seen_prompts = {}
-        deduplicated = []
-
-        for example in self.all_training_data:
-            prompt = example['prompt'].strip().lower()
-
-            if prompt not in seen_prompts:
-                seen_prompts[prompt] = True
-                deduplicated.append(example)
-            else:
-                print(f"  Duplicate found: {example['prompt'][:80]}...")
-
-        self.all_training_data = deduplicated
-        duplicates_removed = initial_count - len(deduplicated)
-
-        print(f"\n  Removed {duplicates_removed} duplicates")
-        print(f"  Final count: {len(self.all_training_data)} unique examples")
-
-    def validate_quality(self):
-        """Validate training data quality"""
-        print("\n=== Quality Validation ===\n")
-
-        issues = []
-
-        for i, example in enumerate(self.all_training_data):
+    def validate_stage(self, examples):
+        """Flag quality issues and fill in missing source/category"""
+        for i, example in enumerate(examples):
             # Check prompt length
             if len(example['prompt']) < 10:
-                issues.append(f"Example {i}: Prompt too short")
+                self._issue("Prompt too short", i)
 
             # Check response length
             if len(example['response']) < 50:
-                issues.append(f"Example {i}: Response too short")
+                self._issue("Response too short", i)
 
             # Check for required fields
             if not example.get('source'):
                 example['source'] = 'unknown'
-                issues.append(f"Example {i}: Missing source")
+                self._issue("Missing source", i)
 
             if not example.get('category'):
                 example['category'] = 'general'
-                issues.append(f"Example {i}: Missing category")
-
-        if issues:
-            print(f"  Found {len(issues)} quality issues:")
-            for issue in issues[:10]:  # Show first 10
-                print(f"    - {issue}")
-            if len(issues) > 10:
-                print(f"    ... and {len(issues) - 10} more")
-        else:
-            print("  ✓ All quality checks passed!")
+                self._issue("Missing category", i)
+
+            yield example
+
+    def stats_stage(self, examples):
+        """Accumulate counts and average lengths of the examples passing through"""
+        for example in examples:
+            self.stats['total_examples'] += 1
+            self.stats['by_source'][example['source']] += 1
+            self.stats['by_category'][example['category']] += 1
+            self._length_totals['prompt'] += len(example['prompt'])
+            self._length_totals['response'] += len(example['response'])
+            yield example
+
+        total = self.stats['total_examples']
+        self.stats['avg_prompt_length'] = self._length_totals['prompt'] / total if total else 0
+        self.stats['avg_response_length'] = self._length_totals['response'] / total if total else 0
+
+    def write_outputs(self, examples, output_file="crowelogic_pharma_expanded_training.jsonl"):
+        """
+        Fan each example out to the main and Ollama-format JSONL files
+
+        Both files are written to temporary paths and renamed into place once
+        the stream is exhausted, so an interrupted run leaves the previous
+        dataset intact.
+        """
+        output_path = self.training_dir / output_file
+        output_path.parent.mkdir(exist_ok=True)
+        ollama_path = output_path.parent / output_file.replace('.jsonl', '_ollama.jsonl')
+        tmp_main = output_path.with_name(output_path.name + '.tmp')
+        tmp_ollama = ollama_path.with_name(ollama_path.name + '.tmp')
+
+        count = 0
+        with open(tmp_main, 'w', encoding='utf-8') as main_f, \
+                open(tmp_ollama, 'w', encoding='utf-8') as ollama_f:
+            for example in examples:
+                main_f.write(json.dumps(example, ensure_ascii=False) + '\n')
+                ollama_format = {
+                    "prompt": example['prompt'],
+                    "response": example['response']
+                }
+                ollama_f.write(json.dumps(ollama_format, ensure_ascii=False) + '\n')
+                count += 1
 
-    def calculate_statistics(self):
-        """Calculate dataset statistics"""
-        print("\n=== Dataset Statistics ===\n")
+        os.replace(tmp_main, output_path)
+        os.replace(tmp_ollama, ollama_path)
+        return output_path, ollama_path, count
+
+    def save_statistics(self, output_path):
+        """Write the statistics JSON next to the main dataset"""
+        stats_path = output_path.with_name(output_path.name.replace('.jsonl', '_stats.json'))
+        stats_data = {
+            'total_examples': self.stats['total_examples'],
+            'avg_prompt_length': self.stats['avg_prompt_length'],
+            'avg_response_length': self.stats['avg_response_length'],
+            'by_source': dict(self.stats['by_source']),
+            'by_category': dict(self.stats['by_category'])
+        }
+        if self.near_dedup is not None:
+            stats_data['near_duplicates'] = self.near_dedup.report()
+        with open(stats_path, 'w', encoding='utf-8') as f:
+            json.dump(stats_data, f, indent=2, ensure_ascii=False)
+        return stats_path
 
-        self.stats['total_examples'] = len(self.all_training_data)
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
 
-        # Calculate average lengths
-        prompt_lengths = [len(ex['prompt']) for ex in self.all_training_data]
-        response_lengths = [len(ex['response']) for ex in self.all_training_data]
+    def report_deduplication(self):
+        print("\n=== Deduplicating Training Data ===\n")
+        for prompt in self.dedup_stats['examples']:
+            print(f"  Duplicate found: {prompt}...")
+        hidden = self.dedup_stats['duplicates'] - len(self.dedup_stats['examples'])
+        if hidden > 0:
+            print(f"  ... and {hidden} more")
+        print(f"\n  Removed {self.dedup_stats['duplicates']} duplicates")
+        print(f"  Final count: {self.dedup_stats['seen'] - self.dedup_stats['duplicates']} unique examples")
+
+    def report_near_duplicates(self, output_path=None):
+        """
+        Summarize near-duplicate clusters
+
+        Representatives are identified by line number in the consolidated
+        output (no later stage drops examples); if output_path is given,
+        their prompts are read back from it.
+        """
+        print("\n=== Near-Duplicate Clusters ===\n")
+        if self.near_dedup is None:
+            print("  Near-duplicate detection disabled")
+            return
+
+        report = self.near_dedup.report(top=self.max_reported_issues)
+        print(f"  Jaccard threshold {report['threshold']} "
+              f"({report['num_perm']} permutations, {report['bands']} bands x {report['rows']} rows)")
+        print(f"  Removed {report['removed']} near-duplicates in {report['clusters']} clusters")
+        if not report['clusters']:
+            return
+
+        sizes = ", ".join(f"{size}: {count}" for size, count in report['cluster_sizes'].items())
+        print(f"  Cluster sizes (size: clusters): {sizes}")
+
+        wanted = {cluster['representative'] for cluster in report['largest']}
+        prompts = {}
+        if output_path is not None:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f):
+                    if line_num in wanted:
+                        prompts[line_num] = json.loads(line)['prompt'][:80]
+                        if len(prompts) == len(wanted):
+                            break
+
+        print("\n  Largest clusters:")
+        for cluster in report['largest']:
+            line = cluster['representative']
+            print(f"    [{cluster['size']} examples, similarity >= {cluster['min_similarity']:.2f}] "
+                  f"kept line {line + 1}: {prompts.get(line, '')}")
+            for prompt in cluster['samples']:
+                print(f"        ~ {prompt}")
+
+    def report_quality(self):
+        print("\n=== Quality Validation ===\n")
+        total = sum(self.quality['issues'].values())
+        if total:
+            print(f"  Found {total} quality issues:")
+            for kind, count in self.quality['issues'].most_common():
+                print(f"    - {kind}: {count}")
+            for issue in self.quality['examples']:
+                print(f"    e.g. {issue}")
+        else:
+            print("  ✓ All quality checks passed!")
 
-        self.stats['avg_prompt_length'] = sum(prompt_lengths) / len(prompt_lengths) if prompt_lengths else 0
-        self.stats['avg_response_length'] = sum(response_lengths) / len(response_lengths) if response_lengths else 0
+    def report_statistics(self):
+        print("\n=== Dataset Statistics ===\n")
+        total = self.stats['total_examples']
 
-        print(f"Total Examples: {self.stats['total_examples']}")
+        print(f"Total Examples: {total}")
         print(f"Average Prompt Length: {self.stats['avg_prompt_length']:.0f} characters")
         print(f"Average Response Length: {self.stats['avg_response_length']:.0f} characters")
 
         print("\n--- By Source ---")
         for source, count in sorted(self.stats['by_source'].items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / self.stats['total_examples']) * 100
+            percentage = (count / total) * 100
             print(f"  {source:30s}: {count:5d} ({percentage:5.1f}%)")
 
         print("\n--- By Category ---")
         for category, count in sorted(self.stats['by_category'].items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / self.stats['total_examples']) * 100
+            percentage = (count / total) * 100
             print(f"  {category:30s}: {count:5d} ({percentage:5.1f}%)")
 
-    def save_consolidated_dataset(self, output_file="crowelogic_pharma_expanded_training.jsonl"):
-        """Save consolidated and expanded training dataset"""
-        print(f"\n=== Saving Consolidated Dataset ===\n")
+    # ------------------------------------------------------------------
+    # List-based helpers (operate on self.all_training_data)
+    # ------------------------------------------------------------------
 
-        output_path = Path("training_data") / output_file
-        output_path.parent.mkdir(exist_ok=True)
+    def load_existing_training_data(self):
+        """Load all existing training data files"""
+        print("\n=== Loading Existing Training Data ===\n")
+        self.all_training_data.extend(self.iter_sources(EXISTING_SOURCES))
+        print(f"\n  Total existing examples loaded: {len(self.all_training_data)}")
 
-        # Save main JSONL format
-        print(f"  Saving to {output_path}...")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for example in self.all_training_data:
-                f.write(json.dumps(example, ensure_ascii=False) + '\n')
-        print(f"  ✓ Saved {len(self.all_training_data)} examples")
+    def load_new_datasets(self):
+        """Load newly generated dataset files"""
+        print("\n=== Loading New Dataset Integrations ===\n")
+        self.all_training_data.extend(self.iter_sources(NEW_SOURCES))
+        print(f"\n  Total with new datasets: {len(self.all_training_data)}")
 
-        # Save Ollama-compatible format
-        ollama_path = output_path.parent / output_file.replace('.jsonl', '_ollama.jsonl')
-        print(f"\n  Creating Ollama format: {ollama_path}...")
-        with open(ollama_path, 'w', encoding='utf-8') as f:
-            for example in self.all_training_data:
-                ollama_format = {
-                    "prompt": example['prompt'],
-                    "response": example['response']
-                }
-                f.write(json.dumps(ollama_format, ensure_ascii=False) + '\n')
-        print(f"  ✓ Saved Ollama format")
+    def deduplicate(self):
+        """Remove duplicate examples based on prompt"""
+        self.all_training_data = list(self.dedup_stage(self.all_training_data))
+        self.report_deduplication()
 
-        # Save statistics
-        stats_path = output_path.parent / output_file.replace('.jsonl', '_stats.json')
-        print(f"\n  Saving statistics: {stats_path}...")
-        stats_data = {
-            'total_examples': self.stats['total_examples'],
-            'avg_prompt_length': self.stats['avg_prompt_length'],
-            'avg_response_length': self.stats['avg_response_length'],
-            'by_source': dict(self.stats['by_source']),
-            'by_category': dict(self.stats['by_category'])
-        }
-        with open(stats_path, 'w', encoding='utf-8') as f:
-            json.dump(stats_data, f, indent=2, ensure_ascii=False)
-        print(f"  ✓ Saved statistics")
+    def near_deduplicate(self):
+        """Remove near-duplicate examples (MinHash/LSH over prompt+response)"""
+        self.all_training_data = list(self.near_dedup_stage(self.all_training_data))
+        self.report_near_duplicates()
+
+    def validate_quality(self):
+        """Validate training data quality"""
+        self.all_training_data = list(self.validate_stage(self.all_training_data))
+        self.report_quality()
+
+    def calculate_statistics(self):
+        """Calculate dataset statistics"""
+        self.stats.update(total_examples=0, by_source=Counter(), by_category=Counter())
+        self._length_totals = {'prompt': 0, 'response': 0}
+        self.all_training_data = list(self.stats_stage(self.all_training_data))
+        self.report_statistics()
 
-        return output_path, ollama_path, stats_path
+    def save_consolidated_dataset(self, output_file="crowelogic_pharma_expanded_training.jsonl"):
+        """Save consolidated and expanded training dataset"""
+        output_path, ollama_path, _ = self.write_outputs(self.all_training_data, output_file)
+        return output_path, ollama_path, self.save_statistics(output_path)
 
     def create_requirements_file(self):
         """Create requirements.txt for the project"""
@@ -291,19 +423,27 @@ flake8>=6.1.0
         print("CroweLogic-Pharma Training Data Consolidation Pipeline")
         print("=" * 70)
 
-        # Load all data
-        self.load_existing_training_data()
-        self.load_new_datasets()
+        self._reset_stats()
 
-        # Process data
-        self.deduplicate()
-        self.validate_quality()
+        # One pass: load -> normalize -> dedup -> near-dedup -> validate -> stats -> writers
+        print("\n=== Streaming Training Data ===\n")
+        examples = self.iter_sources()
+        examples = self.dedup_stage(examples)
+        examples = self.near_dedup_stage(examples)
+        examples = self.validate_stage(examples)
+        examples = self.stats_stage(examples)
+        main_file, ollama_file, written = self.write_outputs(examples)
+        stats_file = self.save_statistics(main_file)
 
-        # Generate statistics
-        self.calculate_statistics()
+        self.report_deduplication()
+        self.report_near_duplicates(main_file)
+        self.report_quality()
+        self.report_statistics()
 
-        # Save consolidated dataset
-        main_file, ollama_file, stats_file = self.save_consolidated_dataset()
+        print(f"\n=== Saved Consolidated Dataset ===\n")
+        print(f"  ✓ Saved {written} examples to {main_file}")
+        print(f"  ✓ Saved Ollama format to {ollama_file}")
+        print(f"  ✓ Saved statistics to {stats_file}")
 
         # Create requirements
         req_file = self.create_requirements_file()
@@ -332,7 +472,40 @@ flake8>=6.1.0
         }
 
 def main():
-    consolidator = TrainingDataConsolidator()
+    parser = argparse.ArgumentParser(
+        description="Consolidate CroweLogic-Pharma training data"
+    )
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=0.85,
+        help="Jaccard similarity treated as a near-duplicate (default: 0.85)"
+    )
+    parser.add_argument(
+        "--no-near-dedup",
+        action="store_true",
+        help="Only remove exact duplicate prompts"
+    )
+    parser.add_argument(
+        "--num-perm",
+        type=int,
+        default=128,
+        help="MinHash signature length (default: 128)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for JSONL parsing and MinHash signatures (default: CPU count)"
+    )
+
+    args = parser.parse_args()
+
+    consolidator = TrainingDataConsolidator(
+        near_dup_threshold=None if args.no_near_dedup else args.near_dup_threshold,
+        num_perm=args.num_perm,
+        workers=args.workers
+    )
     result = consolidator.run_pipeline()
     return result
 
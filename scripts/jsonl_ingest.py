@@ -0,0 +1,426 @@
+"""
+Parallel JSONL Ingestion for CroweLogic-Pharma
+Splits large JSONL files into newline-aligned byte ranges and parses them across processes,
+and gives random access to examples through an mmap-backed line offset index
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # stdlib fallback; json.loads also accepts bytes
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Offset index sidecar: header, then one native uint64 start offset per record
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"JSONLIX2"
+INDEX_HEADER = struct.Struct("<8sQQQQ")  # magic, source size, source mtime_ns, records, malformed
+
+# Applied to each parsed line in the worker; returning None drops the record
+Transform = Callable[[Any], Any]
+
+
+@dataclass
+class IngestReport:
+    """Counts and timing for one JSONL file"""
+    path: str
+    bytes: int = 0
+    lines: int = 0
+    records: int = 0
+    blank: int = 0
+    malformed: int = 0
+    filtered: int = 0
+    seconds: float = 0.0  # wall time, including the consumer's time between records
+    chunks: int = 0
+    workers: int = 1
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (line number, message)
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        """One line: size, throughput and malformed lines"""
+        text = (f"{self.lines} lines, {self.bytes / 1e6:.1f} MB in {self.seconds:.2f}s "
+                f"({self.mb_per_s:.0f} MB/s, {self.workers} worker{'s' if self.workers != 1 else ''}, "
+                f"{JSON_BACKEND})")
+        if self.malformed:
+            line, message = self.errors[0]
+            text += f", {self.malformed} malformed (first at line {line}: {message})"
+        return text
+
+
+def chunk_ranges(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """Byte ranges of about chunk_size that start and end on line boundaries"""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()  # extend to the end of the line containing `end`
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_range(path: str, start: int, end: int, transform: Optional[Transform] = None,
+                max_errors: int = 10) -> Tuple[List, int, int, int, int, List[Tuple[int, str]]]:
+    """
+    Parse the lines in [start, end) of a JSONL file
+
+    Returns:
+        (records, lines, blank, malformed, filtered, errors) with errors as
+        (line number within the range, message), at most max_errors of them
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    records, errors = [], []
+    blank = malformed = filtered = 0
+    lines = data.split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()  # trailing newline
+
+    for line_num, line in enumerate(lines, 1):
+        if not line.strip():
+            blank += 1
+            continue
+        try:
+            record = loads(line)
+        except ValueError as e:  # orjson.JSONDecodeError, json.JSONDecodeError, UnicodeDecodeError
+            malformed += 1
+            if len(errors) < max_errors:
+                errors.append((line_num, str(e)))
+            continue
+        if transform is not None:
+            record = transform(record)
+            if record is None:
+                filtered += 1
+                continue
+        records.append(record)
+
+    return records, len(lines), blank, malformed, filtered, errors
+
+
+def iter_jsonl(path: str, transform: Optional[Transform] = None, workers: Optional[int] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, report: Optional[IngestReport] = None,
+               max_errors: int = 10) -> Iterator:
+    """
+    Parsed records of a JSONL file, in file order
+
+    Files larger than one chunk are parsed by a process pool with a bounded
+    number of chunks in flight, so memory stays proportional to
+    workers * chunk_size. Blank lines are skipped; malformed lines are
+    counted in report instead of raising.
+
+    Args:
+        path: JSONL file
+        transform: Picklable callable applied to each record in the worker
+            (module-level function or functools.partial); None drops it
+        workers: Parser processes (default: CPU count; 1 = in-process)
+        chunk_size: Target bytes per chunk
+        report: Filled in as the file is read
+        max_errors: Malformed-line messages kept in the report
+    """
+    report = report if report is not None else IngestReport(str(path))
+    started = time.perf_counter()
+    ranges = chunk_ranges(path, chunk_size)
+    workers = min(workers or os.cpu_count() or 1, len(ranges)) or 1
+    report.chunks = len(ranges)
+    report.workers = workers
+
+    def account(result, start, end):
+        records, lines, blank, malformed, filtered, errors = result
+        for line_num, message in errors:
+            if len(report.errors) < max_errors:
+                report.errors.append((report.lines + line_num, message))
+        report.bytes += end - start
+        report.lines += lines
+        report.blank += blank
+        report.malformed += malformed
+        report.filtered += filtered
+        report.records += len(records)
+        report.seconds = time.perf_counter() - started
+        return records
+
+    if workers == 1:
+        for start, end in ranges:
+            yield from account(parse_range(path, start, end, transform, max_errors), start, end)
+        return
+
+    executor = ProcessPoolExecutor(workers)
+    pending = deque()
+    try:
+        remaining = iter(ranges)
+        for start, end in remaining:
+            pending.append((executor.submit(parse_range, path, start, end, transform, max_errors),
+                            start, end))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            future, start, end = pending.popleft()
+            for start_next, end_next in remaining:  # keep the pool busy
+                pending.append((executor.submit(parse_range, path, start_next, end_next,
+                                                transform, max_errors), start_next, end_next))
+                break
+            yield from account(future.result(), start, end)
+    finally:
+        for future, _, _ in pending:
+            future.cancel()
+        executor.shutdown()
+
+
+def read_jsonl(path: str, **kwargs) -> Tuple[List, IngestReport]:
+    """All records of a JSONL file with the ingestion report (see iter_jsonl)"""
+    report = IngestReport(str(path))
+    records = list(iter_jsonl(path, report=report, **kwargs))
+    return records, report
+
+
+def build_offsets(path: str) -> Tuple[array, int]:
+    """
+    Start offset of every record in a JSONL file
+
+    Each non-blank line is parsed once; malformed lines are skipped, as
+    iter_jsonl skips them, so every indexed position decodes.
+
+    Returns:
+        (offsets, malformed line count)
+    """
+    offsets = array('Q')
+    malformed = 0
+    if os.path.getsize(path) == 0:
+        return offsets, malformed
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        start = 0
+        while start < size:
+            end = mm.find(b'\n', start)
+            if end == -1:
+                end = size
+            line = mm[start:end]
+            if line.strip():
+                try:
+                    loads(line)
+                    offsets.append(start)
+                except ValueError:
+                    malformed += 1
+            start = end + 1
+    return offsets, malformed
+
+
+def write_index(path: str, index_path: str, offsets: array, malformed: int, stat: os.stat_result):
+    """Write the sidecar index atomically (temp file + rename)"""
+    tmp_path = f"{index_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets), malformed))
+        offsets.tofile(f)
+    os.replace(tmp_path, index_path)
+
+
+class IndexedJSONL:
+    """
+    Random access to the records of a JSONL file
+
+    Features:
+    - Sidecar offset index (<file>.idx): one uint64 line start per record,
+      built on first use and rebuilt when the file's size or mtime changes
+    - Both the data and the index are memory-mapped; nothing is loaded
+      up front, and opening a large indexed file is O(1)
+    - O(1) record access by position (negative indexes too), slicing,
+      seeded random samples and train/eval splits
+
+    Blank and malformed lines are not records: they are left out of the
+    index (and of len(), sampling and splits), and `malformed` counts the
+    lines skipped.
+
+    Example:
+        with IndexedJSONL("training_data/crowelogic_pharma_expanded_training.jsonl") as data:
+            print(len(data), data[0]['prompt'])
+            batch = data.sample(100, seed=42)
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None, rebuild: bool = False):
+        """
+        Args:
+            path: JSONL file
+            index_path: Sidecar location (default: path + ".idx")
+            rebuild: Rebuild the index even if it looks current
+        """
+        self.path = str(path)
+        self.index_path = index_path or self.path + INDEX_SUFFIX
+        self.rebuilt = False
+
+        stat = os.stat(self.path)
+        if rebuild or not self._index_current(stat):
+            offsets, self.malformed = build_offsets(self.path)
+            self.rebuilt = True
+            try:
+                write_index(self.path, self.index_path, offsets, self.malformed, stat)
+            except OSError:  # read-only location: keep the index in memory
+                self._offsets, self._index_mm = memoryview(offsets), None
+                self._open_data(stat)
+                return
+        self._open_index()
+        self._open_data(stat)
+
+    def _index_current(self, stat: os.stat_result) -> bool:
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+            index_size = os.path.getsize(self.index_path)
+        except OSError:
+            return False
+        if len(header) < INDEX_HEADER.size:
+            return False
+        magic, size, mtime_ns, count, self.malformed = INDEX_HEADER.unpack(header)
+        return (magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+                and index_size == INDEX_HEADER.size + 8 * count)
+
+    def _open_index(self):
+        with open(self.index_path, 'rb') as f:
+            if os.path.getsize(self.index_path) == INDEX_HEADER.size:  # no records
+                self._offsets, self._index_mm = memoryview(array('Q')), None
+                return
+            self._index_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._index_mm)[INDEX_HEADER.size:].cast('Q')
+
+    def _open_data(self, stat: os.stat_result):
+        self._size = stat.st_size
+        self._mm = None
+        if self._size:
+            with open(self.path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        # Views into a mapping must be released before the mapping closes
+        self._offsets.release()
+        if self._index_mm is not None:
+            self._index_mm.close()
+        if self._mm is not None:
+            self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def raw(self, i: int) -> bytes:
+        """Bytes of record i (without the newline)"""
+        if i < 0:
+            i += len(self._offsets)
+        start = self._offsets[i]  # raises IndexError when out of range
+        end = self._mm.find(b'\n', start)
+        return self._mm[start:end if end != -1 else self._size]
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        return loads(self.raw(key))
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, indices: Sequence[int]) -> List:
+        """Records at the given positions (reads in file order, returns in given order)"""
+        order = sorted(range(len(indices)), key=indices.__getitem__)
+        records = [None] * len(indices)
+        for position in order:
+            records[position] = self[indices[position]]
+        return records
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List:
+        """k distinct records chosen uniformly at random"""
+        return self.take(random.Random(seed).sample(range(len(self)), k))
+
+    def split(self, eval_fraction: float = 0.1, seed: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        """Shuffled (train, eval) record positions; pass them to take()"""
+        indices = list(range(len(self)))
+        random.Random(seed).shuffle(indices)
+        n_eval = round(len(indices) * eval_fraction)
+        return indices[n_eval:], indices[:n_eval]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect a JSONL file through its offset index"
+    )
+    parser.add_argument("path", help="JSONL file")
+    parser.add_argument(
+        "--show",
+        default=None,
+        help="Record position or start:stop slice to print"
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=0,
+        help="Print this many random records"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for --sample"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the offset index"
+    )
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with IndexedJSONL(args.path, rebuild=args.rebuild) as data:
+        action = "Built" if data.rebuilt else "Loaded"
+        skipped = f", {data.malformed} malformed lines skipped" if data.malformed else ""
+        print(f"{action} index {data.index_path}: {len(data)} records{skipped} "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)", file=sys.stderr)
+
+        records = []
+        if args.show is not None:
+            if ':' in args.show:
+                start, stop = (int(part) if part else None for part in args.show.split(':', 1))
+                records = data[start:stop]
+            else:
+                records = [data[int(args.show)]]
+        if args.sample:
+            records += data.sample(args.sample, seed=args.seed)
+
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Near-Duplicate Detection for CroweLogic-Pharma Training Data
+MinHash signatures over word shingles with an LSH index for candidate lookup
+"""
+
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+HASH_SHIFT = np.uint64(32)
+SHINGLE_BASE = np.uint64(1000003)
+FMIX_C1 = np.uint64(0xff51afd7ed558ccd)
+FMIX_C2 = np.uint64(0xc4ceb9fe1a85ec53)
+
+_WORD = re.compile(r"\w+")
+_PERMUTATIONS: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Universal hash parameters (a, b) for num_perm permutations, cached per process"""
+    key = (num_perm, seed)
+    if key not in _PERMUTATIONS:
+        rng = np.random.RandomState(seed)
+        a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) << np.uint64(1) | np.uint64(1)
+        b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        _PERMUTATIONS[key] = (a, b)
+    return _PERMUTATIONS[key]
+
+
+def _fmix64(h: np.ndarray) -> np.ndarray:
+    """MurmurHash3 64-bit finalizer: every input bit affects every output bit"""
+    with np.errstate(over='ignore'):
+        h = h ^ (h >> np.uint64(33))
+        h = h * FMIX_C1
+        h = h ^ (h >> np.uint64(33))
+        h = h * FMIX_C2
+        return h ^ (h >> np.uint64(33))
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """
+    32-bit hashes of the lowercased word n-grams in text
+
+    Words are hashed once (crc32) and combined into n-gram hashes with a
+    polynomial rolling sum, so no n-gram strings are built; the 64-bit sum
+    is mixed with fmix64 before its top bits are kept, so every word of the
+    n-gram counts. A text with fewer than size words is one shingle of all
+    its words, and a text with none is hashed whole. Repeated n-grams are
+    kept; they do not change a MinHash.
+    """
+    tokens = _WORD.findall(text.lower())
+    if not tokens:
+        tokens = [text.strip()]
+    words = np.fromiter(map(zlib.crc32, map(str.encode, tokens)), dtype=np.uint64)
+    size = min(size, len(words))
+    n = len(words) - size + 1
+    grams = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(size):
+            grams = grams * SHINGLE_BASE + words[j:j + n]
+    return _fmix64(grams) >> HASH_SHIFT
+
+
+def _permute_min(hashes: np.ndarray, offsets: np.ndarray, a: np.ndarray,
+                 b: np.ndarray) -> np.ndarray:
+    """Per-document minimum of the permuted shingle hashes (concatenated input)"""
+    # Multiply-shift hashing: the top 32 bits of (a*x + b) mod 2**64, with
+    # a odd, form a universal family and need no division
+    with np.errstate(over='ignore'):
+        permuted = ((np.outer(a, hashes) + b[:, None]) >> HASH_SHIFT).astype(np.uint32)
+    # Reduce along contiguous rows (permutation-major), then back to one row per document
+    return np.minimum.reduceat(permuted, offsets, axis=1).T
+
+
+def minhash(text: str, num_perm: int = 128, shingle_size: int = 5, seed: int = 1) -> np.ndarray:
+    """MinHash signature of text (uint32, one value per permutation)"""
+    a, b = _permutations(num_perm, seed)
+    return _permute_min(shingles(text, shingle_size), np.zeros(1, dtype=np.int64), a, b)[0]
+
+
+def minhash_batch(texts: List[str], num_perm: int = 128, shingle_size: int = 5,
+                  seed: int = 1, block_rows: int = 16384) -> np.ndarray:
+    """
+    Signatures for a batch of texts, shape (len(texts), num_perm)
+
+    Documents are grouped into blocks of about block_rows shingles and each
+    block is permuted with one vectorized operation.
+    """
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    start, rows, block = 0, 0, []
+    for i, text in enumerate(texts):
+        hashes = shingles(text, shingle_size)
+        block.append(hashes)
+        rows += len(hashes)
+        if rows >= block_rows or i == len(texts) - 1:
+            offsets = np.cumsum([0] + [len(h) for h in block[:-1]])
+            signatures[start:i + 1] = _permute_min(np.concatenate(block), offsets, a, b)
+            start, rows, block = i + 1, 0, []
+    return signatures
+
+
+def _area(y: np.ndarray, x: np.ndarray) -> float:
+    """Trapezoidal integral of y over x"""
+    return float(np.sum((y[1:] + y[:-1]) * np.diff(x)) / 2)
+
+
+def optimal_bands(threshold: float, num_perm: int,
+                  false_positive_weight: float = 0.25,
+                  false_negative_weight: float = 0.75) -> Tuple[int, int]:
+    """
+    LSH (bands, rows) for a Jaccard threshold
+
+    Minimizes the weighted probability mass of false positives (pairs below
+    threshold that share a band) and false negatives (pairs above it that
+    share none), as in Leskovec et al., Mining of Massive Datasets ch. 3.
+    False negatives weigh more by default: a false positive is only an
+    extra candidate that verification rejects, a false negative is a
+    duplicate that stays in the data.
+    """
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = _area(1 - (1 - below ** rows) ** bands, below)
+            fn = _area((1 - above ** rows) ** bands, above)
+            error = false_positive_weight * fp + false_negative_weight * fn
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """
+    LSH index of MinHash signatures
+
+    Each signature is cut into bands; two signatures become candidates when
+    any band matches exactly, so a lookup costs one dict probe per band
+    regardless of index size. Candidates are then verified against the
+    estimated Jaccard similarity (fraction of equal signature values).
+
+    Memory is num_perm * 4 bytes per indexed signature plus one bucket entry
+    per band (about 5 GB per 10M examples at num_perm=128; use num_perm=64
+    for very large corpora).
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128,
+                 lsh_threshold: Optional[float] = None):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at or above which a
+                candidate is a duplicate
+            num_perm: Signature length
+            lsh_threshold: Similarity the banding is tuned for (defaults to
+                threshold; lower it to trade lookup speed for recall)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(
+            threshold if lsh_threshold is None else lsh_threshold, num_perm
+        )
+        self._buckets: List[Dict[int, object]] = [{} for _ in range(self.bands)]
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self.size = 0
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """64-bit bucket key per band, shape (len(signatures), bands)"""
+        signatures = np.atleast_2d(signatures)
+        bands = signatures[:, :self.bands * self.rows].reshape(len(signatures), self.bands, self.rows)
+        keys = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for row in range(self.rows):
+                keys = keys * SHINGLE_BASE + bands[:, :, row]
+        return keys
+
+    def query(self, signature: np.ndarray,
+              keys: Optional[List[int]] = None) -> Optional[Tuple[int, float]]:
+        """Most similar indexed id at or above threshold, with its similarity"""
+        if keys is None:
+            keys = self.band_keys(signature)[0].tolist()
+        candidates = set()
+        for buckets, key in zip(self._buckets, keys):
+            hit = buckets.get(key)
+            if hit is None:
+                continue
+            if isinstance(hit, list):
+                candidates.update(hit)
+            else:
+                candidates.add(hit)
+        if not candidates:
+            return None
+
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[ids] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return int(ids[best]), float(similarity[best])
+
+    def insert(self, signature: np.ndarray, keys: Optional[List[int]] = None) -> int:
+        """Index signature; returns its id (insertion order)"""
+        if keys is None:
+            keys = self.band_keys(signature)[0].tolist()
+        item = self.size
+        if item == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[item] = signature
+        for buckets, key in zip(self._buckets, keys):
+            hit = buckets.get(key)
+            if hit is None:
+                buckets[key] = item
+            elif isinstance(hit, list):
+                hit.append(item)
+            else:
+                buckets[key] = [hit, item]
+        self.size += 1
+        return item
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate removal
+
+    Features:
+    - Word-shingle MinHash signatures, computed in parallel worker
+      processes one batch at a time
+    - Sub-linear candidate lookup through an LSH index of kept examples
+    - First occurrence wins; input order is preserved
+    - Clusters (kept representative + removed near-duplicates) instead of
+      per-line output
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 5,
+                 lsh_threshold: Optional[float] = None, workers: Optional[int] = None,
+                 batch_size: int = 2048, seed: int = 1, max_samples: int = 3):
+        """
+        Args:
+            threshold: Jaccard similarity at or above which examples are
+                near-duplicates
+            num_perm: MinHash signature length (accuracy vs. memory)
+            shingle_size: Words per shingle
+            lsh_threshold: Similarity the LSH banding targets (defaults to
+                threshold)
+            workers: Signature processes (default: CPU count; 1 = in-process)
+            batch_size: Examples per signature batch
+            seed: Permutation seed (same seed, same result)
+            max_samples: Removed prompts kept per cluster for reporting
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.seed = seed
+        self.max_samples = max_samples
+
+        self.index = MinHashLSH(threshold, num_perm, lsh_threshold)
+        self.seen = 0
+        self.removed = 0
+        # representative id (position in the kept stream) -> cluster
+        self.clusters: Dict[int, Dict] = {}
+
+    def _submit(self, texts: List[str], executor: Optional[ProcessPoolExecutor]):
+        """Start signature computation for a batch (in-process without an executor)"""
+        if executor is None:
+            return minhash_batch(texts, self.num_perm, self.shingle_size, self.seed)
+        step = -(-len(texts) // self.workers)
+        return [
+            executor.submit(minhash_batch, texts[i:i + step], self.num_perm,
+                            self.shingle_size, self.seed)
+            for i in range(0, len(texts), step)
+        ]
+
+    def _process(self, batch: List[Dict], pending) -> Iterator[Dict]:
+        if isinstance(pending, list):
+            signatures = np.concatenate([future.result() for future in pending])
+        else:
+            signatures = pending
+        keys = self.index.band_keys(signatures).tolist()
+
+        for example, signature, example_keys in zip(batch, signatures, keys):
+            self.seen += 1
+            match = self.index.query(signature, example_keys)
+            if match is None:
+                self.index.insert(signature, example_keys)
+                yield example
+                continue
+
+            self.removed += 1
+            representative, similarity = match
+            cluster = self.clusters.setdefault(
+                representative, {'size': 1, 'min_similarity': 1.0, 'samples': []}
+            )
+            cluster['size'] += 1
+            cluster['min_similarity'] = min(cluster['min_similarity'], similarity)
+            if len(cluster['samples']) < self.max_samples:
+                cluster['samples'].append(example['prompt'][:80])
+
+    def filter(self, examples: Iterable[Dict],
+               text: Callable[[Dict], str] = lambda e: f"{e['prompt']}\n{e['response']}"
+               ) -> Iterator[Dict]:
+        """Yield examples that are not near-duplicates of an earlier one"""
+        executor = None
+        batch, texts = [], []
+        previous = None  # (batch, pending signatures) being computed by the workers
+        try:
+            for example in examples:
+                batch.append(example)
+                texts.append(text(example))
+                if len(batch) < self.batch_size:
+                    continue
+                # Worker processes only pay off once the input fills a batch
+                if executor is None and self.workers > 1:
+                    executor = ProcessPoolExecutor(self.workers)
+                # Workers sign this batch while the previous one is indexed
+                current = (batch, self._submit(texts, executor))
+                if previous is not None:
+                    yield from self._process(*previous)
+                previous = current
+                batch, texts = [], []
+
+            if previous is not None:
+                yield from self._process(*previous)
+            if batch:
+                yield from self._process(batch, self._submit(texts, executor))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def report(self, top: int = 10) -> Dict:
+        """Cluster summary: counts, size distribution and the largest clusters"""
+        sizes: Dict[int, int] = {}
+        for cluster in self.clusters.values():
+            sizes[cluster['size']] = sizes.get(cluster['size'], 0) + 1
+        largest = sorted(self.clusters.items(), key=lambda item: item[1]['size'], reverse=True)[:top]
+        return {
+            'threshold': self.threshold,
+            'num_perm': self.num_perm,
+            'bands': self.index.bands,
+            'rows': self.index.rows,
+            'examples_checked': self.seen,
+            'removed': self.removed,
+            'clusters': len(self.clusters),
+            'cluster_sizes': dict(sorted(sizes.items())),
+            'largest': [
+                {'representative': representative, **cluster}
+                for representative, cluster in largest
+            ]
+        }
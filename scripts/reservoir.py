@@ -0,0 +1,231 @@
+"""
+Stratified Reservoir Sampling for CroweLogic-Pharma
+One-pass uniform samples per stratum of a JSONL file, read in parallel shards and merged
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from jsonl_ingest import DEFAULT_CHUNK_SIZE, IngestReport, chunk_ranges, loads
+
+
+def allocate_quotas(n: int, available: Dict[str, int]) -> Dict[str, int]:
+    """
+    Split n as evenly as possible across strata without exceeding availability
+
+    Strata with fewer items than an even share take all of them and the
+    rest is shared among the others; leftover units from integer division
+    go to strata in sorted key order.
+    """
+    quotas = {key: 0 for key in available}
+    open_keys = sorted(key for key, count in available.items() if count > 0)
+    remaining = n
+    while remaining > 0 and open_keys:
+        share, extra = divmod(remaining, len(open_keys))
+        next_keys = []
+        for i, key in enumerate(open_keys):
+            want = share + (1 if i < extra else 0)
+            take = min(want, available[key] - quotas[key])
+            quotas[key] += take
+            remaining -= take
+            if quotas[key] < available[key]:
+                next_keys.append(key)
+        if len(next_keys) == len(open_keys):
+            break  # every stratum took its full share
+        open_keys = next_keys
+    return quotas
+
+
+class StratifiedReservoir:
+    """
+    Uniform reservoir sample (Algorithm R) per stratum
+
+    Each stratum keeps up to `capacity` items, a uniform sample of
+    everything added under its key. Reservoirs built over disjoint shards
+    merge into the reservoir of the whole stream.
+    """
+
+    def __init__(self, capacity: int, seed: Any = None):
+        """
+        Args:
+            capacity: Items kept per stratum (the most any stratum can
+                contribute to a sample)
+            seed: Random seed (same seed and input, same sample)
+        """
+        self.capacity = capacity
+        self.rng = random.Random(seed)
+        self.counts: Dict[str, int] = {}
+        self.items: Dict[str, List] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, key: str, item: Any):
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        reservoir = self.items.setdefault(key, [])
+        if len(reservoir) < self.capacity:
+            reservoir.append(item)
+        else:
+            j = self.rng.randrange(count)
+            if j < self.capacity:
+                reservoir[j] = item
+
+    def merge(self, other: 'StratifiedReservoir') -> 'StratifiedReservoir':
+        """
+        Combine with a reservoir built over a disjoint part of the stream
+
+        Each slot of the merged sample is drawn from one side with
+        probability proportional to the items that side still represents,
+        which keeps the result uniform over both streams.
+        """
+        for key in set(self.counts) | set(other.counts):
+            n1, n2 = self.counts.get(key, 0), other.counts.get(key, 0)
+            pool1 = list(self.items.get(key, []))
+            pool2 = list(other.items.get(key, []))
+            self.rng.shuffle(pool1)
+            self.rng.shuffle(pool2)
+
+            merged = []
+            for _ in range(min(self.capacity, n1 + n2)):
+                if self.rng.random() * (n1 + n2) < n1:
+                    merged.append(pool1.pop())
+                    n1 -= 1
+                else:
+                    merged.append(pool2.pop())
+                    n2 -= 1
+            self.items[key] = merged
+            self.counts[key] = self.counts.get(key, 0) + other.counts.get(key, 0)
+        return self
+
+    def select(self, n: int, process: Optional[Callable[[Any], Any]] = None) -> Dict[str, List]:
+        """
+        n items split evenly across strata, processing only the items kept
+
+        Candidates are taken in random order and passed through process;
+        a None result is discarded and the stratum draws another candidate.
+        Quota a stratum cannot fill is reallocated to the others.
+        """
+        candidates = {}
+        for key in sorted(self.items):
+            pool = list(self.items[key])
+            self.rng.shuffle(pool)
+            candidates[key] = pool
+        selected: Dict[str, List] = {key: [] for key in candidates}
+
+        remaining = n
+        while remaining > 0:
+            quotas = allocate_quotas(remaining, {k: len(pool) for k, pool in candidates.items()})
+            if not any(quotas.values()):
+                break
+            for key, quota in quotas.items():
+                pool = candidates[key]
+                while quota > 0 and pool:
+                    result = pool.pop()
+                    if process is not None:
+                        result = process(result)
+                    if result is not None:
+                        selected[key].append(result)
+                        quota -= 1
+                        remaining -= 1
+        return selected
+
+
+def sample_range(path: str, start: int, end: int, key_field: str, default_key: str,
+                 capacity: int, seed: Any, accept: Optional[Callable[[Dict], bool]] = None,
+                 max_errors: int = 10) -> tuple:
+    """
+    Reservoir-sample the lines in [start, end) of a JSONL file by key_field
+
+    Reservoirs hold the raw line bytes, so callers parse only what they keep.
+
+    Returns:
+        (reservoir, lines, blank, malformed, rejected, errors); rejected
+        counts records accept turned down
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    reservoir = StratifiedReservoir(capacity, seed)
+    errors = []
+    blank = malformed = rejected = 0
+    lines = data.split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()
+
+    for line_num, line in enumerate(lines, 1):
+        if not line.strip():
+            blank += 1
+            continue
+        try:
+            record = loads(line)
+        except ValueError as e:
+            malformed += 1
+            if len(errors) < max_errors:
+                errors.append((line_num, str(e)))
+            continue
+        if not isinstance(record, dict) or (accept is not None and not accept(record)):
+            rejected += 1
+            continue
+        reservoir.add(record.get(key_field) or default_key, line)
+
+    return reservoir, len(lines), blank, malformed, rejected, errors
+
+
+def sample_jsonl(path: str, key_field: str, capacity: int, seed: Any = None,
+                 default_key: str = "UNKNOWN", accept: Optional[Callable[[Dict], bool]] = None,
+                 workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 report: Optional[IngestReport] = None, max_errors: int = 10) -> StratifiedReservoir:
+    """
+    Stratified reservoir of a JSONL file's raw lines, keyed by key_field
+
+    The file is cut into newline-aligned chunks that are sampled in
+    parallel and merged in file order. Chunk seeds derive from seed, so the
+    result depends on seed and chunk_size, not on the number of workers.
+
+    Args:
+        accept: Cheap picklable predicate run in the workers; records it
+            rejects never enter a reservoir (counted as filtered in report)
+    """
+    report = report if report is not None else IngestReport(str(path))
+    started = time.perf_counter()
+    ranges = chunk_ranges(path, chunk_size)
+    workers = min(workers or os.cpu_count() or 1, len(ranges)) or 1
+    report.chunks = len(ranges)
+    report.workers = workers
+
+    seeds = [None if seed is None else f"{seed}:{i}" for i in range(len(ranges))]
+    args = (
+        [path] * len(ranges), [start for start, _ in ranges], [end for _, end in ranges],
+        [key_field] * len(ranges), [default_key] * len(ranges), [capacity] * len(ranges),
+        seeds, [accept] * len(ranges), [max_errors] * len(ranges)
+    )
+    if workers == 1:
+        shards = map(sample_range, *args)
+    else:
+        executor = ProcessPoolExecutor(workers)
+        shards = executor.map(sample_range, *args)
+
+    merged = StratifiedReservoir(capacity, seed)
+    try:
+        for (start, end), (reservoir, lines, blank, malformed, rejected, errors) in zip(ranges, shards):
+            merged.merge(reservoir)
+            for line_num, message in errors:
+                if len(report.errors) < max_errors:
+                    report.errors.append((report.lines + line_num, message))
+            report.bytes += end - start
+            report.lines += lines
+            report.blank += blank
+            report.malformed += malformed
+            report.filtered += rejected
+            report.records += lines - blank - malformed
+            report.seconds = time.perf_counter() - started
+    finally:
+        if workers > 1:
+            executor.shutdown()
+    return merged
@@ -9,9 +9,14 @@ __author__ = "Michael Benjamin Crowe"
 from .quantum_chemistry import QuantumChemistryEngine
 from .molecular_simulator import MolecularSimulator
 from .drug_discovery_ai import DrugDiscoveryAI
+from .orbital_cache import OrbitalCache
+from .compound_registry import CompoundRegistry, default_registry
 
 __all__ = [
     'QuantumChemistryEngine',
     'MolecularSimulator',
-    'DrugDiscoveryAI'
+    'DrugDiscoveryAI',
+    'OrbitalCache',
+    'CompoundRegistry',
+    'default_registry'
 ]
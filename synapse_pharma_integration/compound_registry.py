@@ -0,0 +1,92 @@
+"""
+Compound Registry
+Indexed table of compounds with structure, descriptors and target pocket
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_COMPOUNDS_FILE = Path(__file__).parent / 'data' / 'compounds.json'
+
+
+class CompoundRegistry:
+    """
+    Registry of compounds available to the discovery pipeline
+
+    Each record is a dict with:
+    - 'id', 'name', 'synonyms': identifiers (all resolvable by lookup)
+    - 'structure': Hückel molecule ('atoms' and 'bonds')
+    - 'descriptors': ADME / docking descriptors (MW, logP, volume, ...)
+    - 'target': binding site ('name', 'pocket_volume', 'residues')
+    - 'quantum': report label, derived 'properties' and static 'annotations'
+    - 'docking': 'mechanism' and 'therapeutic_potential'
+
+    Lookups by normalized id, name or synonym are O(1).
+    """
+
+    def __init__(self, records: Optional[Iterable[Dict]] = None):
+        self._records: Dict[str, Dict] = {}
+        self._index: Dict[str, str] = {}
+
+        for record in records or []:
+            self.register(record)
+
+    @classmethod
+    def from_json(cls, path: str) -> 'CompoundRegistry':
+        """Load a registry from a JSON list of compound records"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Normalize a compound identifier ('Ganoderic Acid-A' -> 'ganoderic_acid_a')"""
+        return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+    def register(self, record: Dict):
+        """
+        Add a compound record
+
+        Raises:
+            ValueError: If an identifier is already used by another compound
+        """
+        compound_id = self.normalize(record['id'])
+
+        keys = {compound_id, self.normalize(record['name'])}
+        keys.update(self.normalize(synonym) for synonym in record.get('synonyms', []))
+
+        for key in keys:
+            owner = self._index.get(key)
+            if owner is not None and owner != compound_id:
+                raise ValueError(f"Identifier '{key}' already registered for {owner}")
+
+        self._records[compound_id] = record
+        for key in keys:
+            self._index[key] = compound_id
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Look up a compound by id, name or synonym (None if unknown)"""
+        compound_id = self._index.get(self.normalize(name))
+        return self._records[compound_id] if compound_id is not None else None
+
+    def ids(self) -> List[str]:
+        """Registered compound ids"""
+        return list(self._records)
+
+    def records(self) -> List[Dict]:
+        """Registered compound records"""
+        return list(self._records.values())
+
+    def __contains__(self, name: str) -> bool:
+        return self.normalize(name) in self._index
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+@lru_cache(maxsize=None)
+def default_registry() -> CompoundRegistry:
+    """Registry of the bundled compounds, loaded once per process"""
+    return CompoundRegistry.from_json(DEFAULT_COMPOUNDS_FILE)
@@ -3,11 +3,15 @@ Drug Discovery AI Integration
 Combines Synapse-Lang quantum computing with CroweLogic-Pharma AI
 """
 
+import os
 import numpy as np
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 import synapse_lang
 from .quantum_chemistry import QuantumChemistryEngine
 from .molecular_simulator import MolecularSimulator
+from .orbital_cache import OrbitalCache
+from .compound_registry import CompoundRegistry, default_registry
 
 
 class DrugDiscoveryAI:
@@ -21,8 +25,19 @@ class DrugDiscoveryAI:
     - ADME-Tox analysis
     """
 
-    def __init__(self):
-        self.quantum_engine = QuantumChemistryEngine()
+    def __init__(self, orbital_cache: Optional[OrbitalCache] = None,
+                 registry: Optional[CompoundRegistry] = None):
+        """
+        Args:
+            orbital_cache: Cache for quantum results; pass
+                OrbitalCache(path=...) to persist across restarts.
+                Defaults to an in-memory cache.
+            registry: Compounds available for analysis. Defaults to the
+                bundled registry.
+        """
+        self.registry = registry if registry is not None else default_registry()
+        self.orbital_cache = orbital_cache if orbital_cache is not None else OrbitalCache()
+        self.quantum_engine = QuantumChemistryEngine(cache=self.orbital_cache)
         self.simulator = MolecularSimulator()
 
     def full_analysis(self, compound_name: str, target_name: str = None) -> Dict:
@@ -30,7 +45,7 @@ class DrugDiscoveryAI:
         Complete drug discovery analysis pipeline
 
         Args:
-            compound_name: Name of compound (e.g., 'hericenone', 'ganoderic')
+            compound_name: Registry id, name or synonym (e.g., 'hericenone_A')
             target_name: Optional target protein
 
         Returns:
@@ -42,16 +57,16 @@ class DrugDiscoveryAI:
             'analysis_type': 'Full Pipeline'
         }
 
-        # Step 1: Quantum Chemistry Analysis
-        if 'hericenone' in compound_name.lower():
-            quantum_data = self.quantum_engine.analyze_hericenone_structure()
-            docking_data = self.simulator.simulate_hericenone_docking()
-        elif 'ganoderic' in compound_name.lower():
-            quantum_data = self.quantum_engine.analyze_ganoderic_acid_structure()
-            docking_data = self.simulator.simulate_ganoderic_acid_docking()
-        else:
+        compound = self.registry.get(compound_name)
+        if compound is None:
             return {'error': 'Compound not recognized'}
 
+        # Step 1: Quantum Chemistry Analysis
+        quantum_data = self.quantum_engine.analyze_compound_structure(compound)
+
+        # Step 2: Docking against the registered target pocket
+        docking_data = self.simulator.simulate_docking(compound)
+
         # Combine results
         results['quantum_properties'] = quantum_data
         results['docking_results'] = docking_data
@@ -114,24 +129,52 @@ class DrugDiscoveryAI:
         return recommendation
 
 
-def run_discovery_pipeline(compounds: List[str]) -> Dict:
+# Per-process engine for parallel pipelines (set by _init_pipeline_worker)
+_worker_ai: Optional['DrugDiscoveryAI'] = None
+
+
+def _init_pipeline_worker(registry: Optional[CompoundRegistry] = None):
+    """Build one DrugDiscoveryAI per worker process"""
+    global _worker_ai
+    _worker_ai = DrugDiscoveryAI(registry=registry)
+
+
+def _analyze_in_worker(compound: str) -> Dict:
+    return _worker_ai.full_analysis(compound)
+
+
+def run_discovery_pipeline(compounds: List[str], workers: Optional[int] = 1,
+                           chunk_size: int = 1,
+                           registry: Optional[CompoundRegistry] = None) -> Dict:
     """
     Run full discovery pipeline on multiple compounds
 
     Args:
         compounds: List of compound names
+        workers: Worker processes; 1 runs sequentially in this process,
+            None uses every available core
+        chunk_size: Compounds sent to a worker per task
+        registry: Compounds available for analysis (copied to each
+            worker). Defaults to the bundled registry.
 
     Returns:
-        Complete analysis for all compounds
+        Complete analysis for all compounds, in input order
     """
-    ai = DrugDiscoveryAI()
-    results = {}
+    if workers == 1:
+        ai = DrugDiscoveryAI(registry=registry)
+        results = {}
 
-    for compound in compounds:
-        print(f"\nAnalyzing {compound}...")
-        results[compound] = ai.full_analysis(compound)
+        for compound in compounds:
+            print(f"\nAnalyzing {compound}...")
+            results[compound] = ai.full_analysis(compound)
+
+        return results
 
-    return results
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_pipeline_worker,
+                             initargs=(registry,)) as pool:
+        analyses = pool.map(_analyze_in_worker, compounds, chunksize=chunk_size)
+        return dict(zip(compounds, analyses))
 
 
 def demo_drug_discovery_ai():
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Sparse Hückel Solver Benchmark
+Finds the crossover point between dense and sparse frontier-orbital solvers
+"""
+
+import sys
+sys.path.insert(0, '../..')
+
+import time
+
+from synapse_pharma_integration.quantum_chemistry import QuantumChemistryEngine
+
+
+def make_polyacene(n_rings):
+    """Linear polyacene ladder (4 * n_rings + 2 π-centres)"""
+    n_top = 2 * n_rings + 1
+    n_atoms = 2 * n_top
+    bonds = []
+
+    for i in range(n_top - 1):
+        bonds.append({'atoms': [i, i + 1], 'order': 1})                   # top edge
+        bonds.append({'atoms': [n_top + i, n_top + i + 1], 'order': 1})   # bottom edge
+    for i in range(0, n_top, 2):
+        bonds.append({'atoms': [i, n_top + i], 'order': 2})               # rungs
+
+    return {
+        'atoms': [{'element': 'C', 'position': [1.4 * (i % n_top), 1.4 * (i // n_top), 0]}
+                  for i in range(n_atoms)],
+        'bonds': bonds
+    }
+
+
+def best_of(fn, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    engine = QuantumChemistryEngine()
+
+    print("\n" + "="*80)
+    print("SPARSE vs DENSE HÜCKEL SOLVER - CROSSOVER BENCHMARK")
+    print("="*80)
+    print(f"\n{'π-centres':>10} {'Dense (ms)':>12} {'Sparse (ms)':>12} {'Speedup':>9} {'|ΔGap|':>10}")
+    print("-"*60)
+
+    crossover = None
+    for n_rings in [12, 25, 50, 75, 100, 150, 250, 500, 1000]:
+        molecule = make_polyacene(n_rings)
+        n_atoms = len(molecule['atoms'])
+
+        dense_time, dense = best_of(
+            lambda: engine.calculate_molecular_orbitals(molecule, method='dense'))
+        sparse_time, sparse = best_of(
+            lambda: engine.calculate_molecular_orbitals(molecule, method='sparse'))
+
+        gap_error = abs(dense['homo_lumo_gap'] - sparse['homo_lumo_gap'])
+        speedup = dense_time / sparse_time
+        if crossover is None and speedup > 1:
+            crossover = n_atoms
+
+        print(f"{n_atoms:>10} {dense_time * 1e3:>12.2f} {sparse_time * 1e3:>12.2f} "
+              f"{speedup:>8.1f}x {gap_error:>10.1e}")
+
+    print(f"\n   Sparse solver wins from ~{crossover} π-centres "
+          f"(auto threshold: {engine.sparse_threshold})")
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
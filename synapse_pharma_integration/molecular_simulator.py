@@ -3,10 +3,43 @@ Molecular Dynamics Simulator using Synapse-Lang
 Simulate molecular interactions and binding dynamics
 """
 
+import heapq
 import numpy as np
 import scipy.optimize as opt
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import synapse_lang
+from .compound_registry import default_registry
+
+
+def _descriptor_columns(table: Any, defaults: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """
+    Extract descriptor columns from a columnar ligand table
+
+    Accepts a dict of arrays, a NumPy structured array, a pandas DataFrame or
+    a pyarrow Table. Missing columns are filled with the scalar default, as
+    the per-molecule dict API does with .get().
+    """
+    if hasattr(table, 'column_names'):  # pyarrow.Table
+        names = set(table.column_names)
+        n_rows = table.num_rows
+        get = lambda name: table.column(name).to_numpy()
+    elif getattr(getattr(table, 'dtype', None), 'names', None):  # structured array
+        names = set(table.dtype.names)
+        n_rows = len(table)
+        get = lambda name: table[name]
+    elif hasattr(table, 'columns'):  # pandas.DataFrame
+        names = set(table.columns)
+        n_rows = len(table)
+        get = lambda name: table[name].to_numpy()
+    else:  # mapping of column name -> array
+        names = set(table)
+        n_rows = len(next(iter(table.values()))) if table else 0
+        get = lambda name: table[name]
+
+    return {
+        name: np.asarray(get(name)) if name in names else np.full(n_rows, default)
+        for name, default in defaults.items()
+    }
 
 
 class MolecularSimulator:
@@ -63,6 +96,38 @@ class MolecularSimulator:
 
         return score
 
+    def score_batch(self, ligands: Any, protein: Dict) -> np.ndarray:
+        """
+        Vectorized docking scores for a table of ligands against one pocket
+
+        Same terms, defaults and operation order as simple_docking_score, so
+        each element matches the scalar result bit-for-bit.
+
+        Args:
+            ligands: Columnar ligand table (dict of arrays, structured array,
+                pandas DataFrame or pyarrow Table) with 'volume', 'logP',
+                'h_donors', 'h_acceptors' and 'molecular_weight' columns
+            protein: Protein binding site data
+
+        Returns:
+            Array of docking scores (more negative = better binding)
+        """
+        cols = _descriptor_columns(ligands, {
+            'volume': 500,
+            'logP': 2.0,
+            'h_donors': 2,
+            'h_acceptors': 3,
+            'molecular_weight': 350
+        })
+        pocket_volume = protein.get('pocket_volume', 600)  # Å³
+
+        shape_score = -np.abs(cols['volume'] - pocket_volume) * 0.01
+        hydrophobic_score = cols['logP'] * -0.5
+        h_bond_score = -(cols['h_donors'] + cols['h_acceptors']) * 0.7
+        mw_penalty = (cols['molecular_weight'] - 350) * 0.005
+
+        return shape_score + hydrophobic_score + h_bond_score + mw_penalty
+
     def estimate_binding_affinity(self, docking_score: float) -> Dict:
         """
         Convert docking score to binding affinity (Kd, Ki)
@@ -95,6 +160,48 @@ class MolecularSimulator:
             'IC50_nM_estimated': Kd_nM * 2  # Rough estimate
         }
 
+    # Decimal exponents representable as finite, normal float64 values
+    # (pulled in slightly so 10 ** x cannot round past the limits)
+    _LOG10_FLOAT_MIN = float(np.log10(np.finfo(np.float64).tiny)) + 1e-9
+    _LOG10_FLOAT_MAX = float(np.log10(np.finfo(np.float64).max)) - 1e-9
+
+    def estimate_binding_affinity_batch(self, docking_scores: Any) -> Dict[str, np.ndarray]:
+        """
+        Convert a vector of docking scores to binding affinities
+
+        Works in log space: log10(Kd) = -ΔG / (RT ln 10), so pKi is exact and
+        finite for any finite score. Concentration columns are exponentiated
+        from the log values and saturate at the float64 limits instead of
+        overflowing to inf or underflowing to 0.
+
+        Args:
+            docking_scores: Array-like of docking scores in kcal/mol
+
+        Returns:
+            Dict of arrays with Kd, Ki, IC50 and pKi values
+        """
+        delta_G = np.asarray(docking_scores, dtype=np.float64)  # kcal/mol
+
+        log10_Kd_M = -delta_G / (self.RT * np.log(10))
+        log10_Kd_nM = log10_Kd_M + 9
+        log10_IC50_nM = log10_Kd_nM + np.log10(2)  # Rough estimate: IC50 ≈ 2 Kd
+
+        def from_log10(values):
+            return 10 ** np.clip(values, self._LOG10_FLOAT_MIN, self._LOG10_FLOAT_MAX)
+
+        Kd_nM = from_log10(log10_Kd_nM)
+
+        return {
+            'docking_score': delta_G,
+            'delta_G': delta_G,
+            'log10_Kd_M': log10_Kd_M,
+            'Kd_M': from_log10(log10_Kd_M),
+            'Kd_nM': Kd_nM,
+            'Ki_nM': Kd_nM,  # Approximation
+            'pKi': -log10_Kd_M,
+            'IC50_nM_estimated': from_log10(log10_IC50_nM)
+        }
+
     def predict_adme_properties(self, molecule: Dict) -> Dict:
         """
         Predict ADME (Absorption, Distribution, Metabolism, Excretion) properties
@@ -149,50 +256,112 @@ class MolecularSimulator:
             'bioavailability_score': 0.55 if oral_bioavailability else 0.17
         }
 
-    def simulate_hericenone_docking(self) -> Dict:
+    def predict_adme_batch(self, molecules: Any, prefilter: bool = False) -> Dict[str, np.ndarray]:
         """
-        Simulate hericenone docking to NGF receptor (TrkA)
+        Vectorized ADME rules over a descriptor table
+
+        Evaluates the same rules as predict_adme_properties for N molecules at
+        once and returns one array per property.
+
+        Args:
+            molecules: Columnar descriptor table (dict of arrays, structured
+                array, pandas DataFrame or pyarrow Table)
+            prefilter: Return only molecules with < 2 Lipinski violations.
+                This filters the output; it is not a speedup, since gathering
+                the kept rows costs about what the skipped rules would
 
         Returns:
-            Docking results and binding predictions
+            Dict of arrays; 'index' holds the input row of each output row
         """
-        # Hericenone A properties (estimated)
-        hericenone = {
-            'name': 'Hericenone A',
-            'molecular_weight': 354.5,
-            'logP': 3.2,
+        cols = _descriptor_columns(molecules, {
+            'molecular_weight': 350,
+            'logP': 2.5,
             'h_donors': 2,
             'h_acceptors': 4,
-            'rotatable_bonds': 3,
-            'tpsa': 68,
-            'volume': 380
-        }
+            'rotatable_bonds': 5,
+            'tpsa': 75
+        })
+
+        # Lipinski's Rule of Five
+        lipinski_violations = (
+            (cols['molecular_weight'] > 500).astype(np.int8)
+            + (cols['logP'] > 5)
+            + (cols['h_donors'] > 5)
+            + (cols['h_acceptors'] > 10)
+        )
+        index = np.arange(len(lipinski_violations))
+
+        if prefilter:
+            # Gather by row number (cheaper than a boolean mask per column),
+            # and only the columns the remaining rules read
+            index = np.flatnonzero(lipinski_violations < 2)
+            lipinski_violations = lipinski_violations.take(index)
+            cols = {name: cols[name].take(index)
+                    for name in ('molecular_weight', 'logP', 'h_donors', 'rotatable_bonds', 'tpsa')}
+
+        mw, logP, h_donors, tpsa = cols['molecular_weight'], cols['logP'], cols['h_donors'], cols['tpsa']
+
+        # Absorption prediction (Caco-2 permeability)
+        caco2_permeability = 10 ** (-1.3 - 0.05 * tpsa - 0.15 * h_donors)
+
+        # Oral bioavailability prediction
+        oral_bioavailability = ((lipinski_violations == 0) &
+                                (cols['rotatable_bonds'] <= 10) &
+                                (tpsa <= 140))
 
-        # TrkA binding site (simplified)
-        trka_site = {
-            'name': 'TrkA (NGF Receptor)',
-            'pocket_volume': 420,
-            'residues': ['Asp402', 'Glu403', 'Lys505']
+        return {
+            'index': index,
+            'lipinski_violations': lipinski_violations,
+            'drug_like': lipinski_violations <= 1,
+            'caco2_permeability': caco2_permeability,
+            'high_absorption': caco2_permeability > 1e-6,
+            'bbb_penetration': (tpsa < 90) & (mw < 450) & (h_donors < 3),
+            'pgp_substrate': (mw > 400) | (logP > 4),
+            'oral_bioavailability': oral_bioavailability,
+            'tpsa': tpsa,
+            'bioavailability_score': np.where(oral_bioavailability, 0.55, 0.17)
         }
 
+    def simulate_docking(self, compound: Dict) -> Dict:
+        """
+        Simulate docking of a registered compound to its target pocket
+
+        Args:
+            compound: Compound registry record (see CompoundRegistry)
+
+        Returns:
+            Docking results and binding predictions
+        """
+        ligand = dict(compound['descriptors'], name=compound['name'])
+        site = compound['target']
+
         # Perform docking
-        docking_score = self.simple_docking_score(hericenone, trka_site)
+        docking_score = self.simple_docking_score(ligand, site)
         binding_affinity = self.estimate_binding_affinity(docking_score)
-        adme = self.predict_adme_properties(hericenone)
+        adme = self.predict_adme_properties(ligand)
 
         return {
-            'compound': hericenone['name'],
-            'target': trka_site['name'],
+            'compound': ligand['name'],
+            'target': site['name'],
             'docking_score': docking_score,
             'predicted_Kd_nM': binding_affinity['Kd_nM'],
             'predicted_Ki_nM': binding_affinity['Ki_nM'],
             'predicted_IC50_nM': binding_affinity['IC50_nM_estimated'],
             'pKi': binding_affinity['pKi'],
             'adme_properties': adme,
-            'mechanism': 'Indirect NGF stimulation via TrkA modulation',
-            'therapeutic_potential': 'Neuroprotection, cognitive enhancement'
+            'mechanism': compound['docking']['mechanism'],
+            'therapeutic_potential': compound['docking']['therapeutic_potential']
         }
 
+    def simulate_hericenone_docking(self) -> Dict:
+        """
+        Simulate hericenone docking to NGF receptor (TrkA)
+
+        Returns:
+            Docking results and binding predictions
+        """
+        return self.simulate_docking(default_registry().get('hericenone_a'))
+
     def simulate_ganoderic_acid_docking(self) -> Dict:
         """
         Simulate ganoderic acid docking to NF-κB
@@ -200,70 +369,75 @@ class MolecularSimulator:
         Returns:
             Docking results for anti-inflammatory target
         """
-        ganoderic = {
-            'name': 'Ganoderic Acid A',
-            'molecular_weight': 516.7,
-            'logP': 5.8,
-            'h_donors': 4,
-            'h_acceptors': 7,
-            'rotatable_bonds': 6,
-            'tpsa': 115,
-            'volume': 580
-        }
+        return self.simulate_docking(default_registry().get('ganoderic_acid_a'))
 
-        nfkb_site = {
-            'name': 'NF-κB p65 subunit',
-            'pocket_volume': 650,
-            'residues': ['Arg33', 'Arg35', 'Glu39']
-        }
-
-        docking_score = self.simple_docking_score(ganoderic, nfkb_site)
-        binding_affinity = self.estimate_binding_affinity(docking_score)
-        adme = self.predict_adme_properties(ganoderic)
-
-        return {
-            'compound': ganoderic['name'],
-            'target': nfkb_site['name'],
-            'docking_score': docking_score,
-            'predicted_Kd_nM': binding_affinity['Kd_nM'],
-            'predicted_Ki_nM': binding_affinity['Ki_nM'],
-            'predicted_IC50_nM': binding_affinity['IC50_nM_estimated'],
-            'pKi': binding_affinity['pKi'],
-            'adme_properties': adme,
-            'mechanism': 'NF-κB pathway inhibition',
-            'therapeutic_potential': 'Anti-inflammatory, immunomodulatory, hepatoprotection'
-        }
-
-    def compare_compounds(self, compounds_data: List[Dict]) -> Dict:
+    def compare_compounds(self, compounds_data: Iterable[Dict], top_k: Optional[int] = None) -> Dict:
         """
         Compare multiple compounds side-by-side
 
         Args:
-            compounds_data: List of compound docking results
+            compounds_data: List (or any iterable) of compound docking results
+            top_k: Keep only the k best binders. The input is consumed as a
+                stream with a bounded heap, so memory is O(k) rather than O(N)
 
         Returns:
             Ranked comparison
         """
+        if top_k is not None:
+            return self._compare_compounds_top_k(compounds_data, top_k)
+
         ranked = sorted(compounds_data, key=lambda x: x['docking_score'])
 
         comparison = {
             'best_binder': ranked[0]['compound'],
             'best_docking_score': ranked[0]['docking_score'],
-            'ranking': [
-                {
-                    'rank': i + 1,
-                    'compound': comp['compound'],
-                    'target': comp['target'],
-                    'docking_score': comp['docking_score'],
-                    'predicted_Ki_nM': comp['predicted_Ki_nM'],
-                    'drug_likeness': comp['adme_properties']['drug_likeness']
-                }
-                for i, comp in enumerate(ranked)
-            ]
+            'ranking': [self._ranking_entry(i + 1, comp) for i, comp in enumerate(ranked)]
         }
 
         return comparison
 
+    def _compare_compounds_top_k(self, compounds_data: Iterable[Dict], top_k: int) -> Dict:
+        """Streaming top-k ranking over an iterator of docking results"""
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+
+        # Max-heap on docking score via negation; the root is the worst kept
+        # compound. Ties keep the earlier compound, matching a stable sort.
+        heap: List[Tuple[float, int, Dict]] = []
+        n_screened = 0
+
+        for seq, comp in enumerate(compounds_data):
+            n_screened += 1
+            entry = (-comp['docking_score'], -seq, comp)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+
+        if not heap:
+            raise ValueError("No compounds to compare")
+
+        ranked = [comp for _, _, comp in sorted(heap, key=lambda e: (-e[0], -e[1]))]
+
+        return {
+            'best_binder': ranked[0]['compound'],
+            'best_docking_score': ranked[0]['docking_score'],
+            'compounds_screened': n_screened,
+            'ranking': [self._ranking_entry(i + 1, comp) for i, comp in enumerate(ranked)]
+        }
+
+    @staticmethod
+    def _ranking_entry(rank: int, comp: Dict) -> Dict:
+        """Summary row for a ranked compound"""
+        return {
+            'rank': rank,
+            'compound': comp['compound'],
+            'target': comp['target'],
+            'docking_score': comp['docking_score'],
+            'predicted_Ki_nM': comp['predicted_Ki_nM'],
+            'drug_likeness': comp['adme_properties']['drug_likeness']
+        }
+
 
 def demo_molecular_simulation():
     """Demo of molecular simulation"""
@@ -0,0 +1,175 @@
+"""
+Orbital Cache for the Quantum Chemistry Engine
+Content-addressed storage of orbital energies, coefficients, spectra and dipoles
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class OrbitalCache:
+    """
+    Two-tier cache for quantum chemistry results
+
+    Features:
+    - Canonical hashing of a molecule's atoms and bonds
+    - In-memory LRU with size-bounded eviction
+    - Optional SQLite store that survives process restarts
+    - Hit/miss statistics
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None,
+                 max_disk_entries: int = 100000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = Path(path).expanduser() if path else None
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'disk_evictions': 0
+        }
+
+        self._db = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS orbital_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS orbital_cache_accessed ON orbital_cache (accessed)"
+            )
+            self._db.commit()
+            # Row count kept in memory so inserts need no COUNT(*) scan
+            self._disk_count = self._db.execute("SELECT COUNT(*) FROM orbital_cache").fetchone()[0]
+
+    @staticmethod
+    def molecule_key(molecule: Dict, kind: str = 'orbitals', **params) -> str:
+        """
+        Canonical content hash of a molecule
+
+        Args:
+            molecule: Dict with 'atoms' and 'bonds' information
+            kind: Result type stored under the key (e.g. 'orbitals', 'uv_vis')
+            **params: Calculation parameters that change the result
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        atoms = [
+            [atom.get('element'), [round(float(x), 6) for x in atom.get('position', [])]]
+            for atom in molecule['atoms']
+        ]
+        bonds = sorted(
+            [sorted(int(i) for i in bond['atoms']), bond.get('order', 1)]
+            for bond in molecule.get('bonds', [])
+        )
+        canonical = json.dumps(
+            {'atoms': atoms, 'bonds': bonds, 'kind': kind, 'params': params},
+            sort_keys=True, separators=(',', ':')
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a cached value (memory first, then disk)"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM orbital_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE orbital_cache SET accessed = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._db.commit()
+                    value = pickle.loads(row[0])
+                    self._remember(key, value)
+                    self._stats['disk_hits'] += 1
+                    return value
+
+            self._stats['misses'] += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """Store a value in memory and, if configured, on disk"""
+        with self._lock:
+            self._remember(key, value)
+
+            if self._db is not None:
+                row = (pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time(), key)
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO orbital_cache (value, accessed, key) VALUES (?, ?, ?)", row
+                ).rowcount
+                if inserted:
+                    self._disk_count += 1
+                else:
+                    self._db.execute(
+                        "UPDATE orbital_cache SET value = ?, accessed = ? WHERE key = ?", row
+                    )
+
+                overflow = self._disk_count - self.max_disk_entries
+                if overflow > 0:
+                    evicted = self._db.execute(
+                        "DELETE FROM orbital_cache WHERE key IN ("
+                        "SELECT key FROM orbital_cache ORDER BY accessed LIMIT ?)", (overflow,)
+                    ).rowcount
+                    self._disk_count -= evicted
+                    self._stats['disk_evictions'] += evicted
+                self._db.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Drop all cached entries (memory and disk)"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM orbital_cache")
+                self._db.commit()
+                self._disk_count = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss statistics and current sizes"""
+        with self._lock:
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            lookups = hits + self._stats['misses']
+            return {
+                **self._stats,
+                'hits': hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'disk_entries': self._disk_count if self._db is not None else 0
+            }
+
+    def _remember(self, key: str, value: Any):
+        """Insert into the LRU, evicting the least recently used entries"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
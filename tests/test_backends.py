@@ -0,0 +1,52 @@
+"""
+Tests for the Ollama backend pool's circuit breaker
+"""
+
+import asyncio
+
+import pytest
+
+from crowelogic_ollama.backends import Backend, BackendPool, CircuitBreaker, NoBackendAvailable
+
+MODEL = "CroweLogic-Pharma:mini"
+
+
+def half_open_pool():
+    backend = Backend("http://gpu-a:11434", failure_threshold=1, reset_timeout=0.0)
+    backend.breaker.record_failure()  # open; reset_timeout 0 -> half-open on next allow()
+    return BackendPool([backend]), backend
+
+
+def test_cancelled_half_open_trial_frees_the_backend():
+    pool, backend = half_open_pool()
+
+    async def trial():
+        with pool.lease(pool.select(MODEL)):
+            await asyncio.sleep(60)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(trial())
+        await asyncio.sleep(0)
+        assert backend.breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(NoBackendAvailable):
+            pool.select(MODEL)  # the single trial is in flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert backend.outstanding == 0
+    assert pool.select(MODEL) is backend
+
+
+def test_closed_generator_frees_the_half_open_trial():
+    pool, backend = half_open_pool()
+
+    def relay():
+        with pool.lease(pool.select(MODEL)):
+            yield "token"
+
+    stream = relay()
+    next(stream)
+    stream.close()  # GeneratorExit inside the lease
+    assert pool.select(MODEL) is backend
@@ -0,0 +1,64 @@
+"""
+Tests for the offset-indexed JSONL reader
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'scripts'))
+
+from jsonl_ingest import INDEX_HEADER, IndexedJSONL, read_jsonl  # noqa: E402
+
+
+def write_corpus(tmp_path, n_records=200):
+    """JSONL with a malformed line after every tenth record, plus blank lines"""
+    lines = []
+    for i in range(n_records):
+        lines.append(f'{{"i": {i}}}')
+        if i % 10 == 0:
+            lines.append('{"i": truncated')
+        if i % 25 == 0:
+            lines.append('   ')
+    path = tmp_path / 'data.jsonl'
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return str(path)
+
+
+def test_malformed_lines_are_left_out_of_the_index(tmp_path):
+    path = write_corpus(tmp_path)
+    records, report = read_jsonl(path, workers=1)
+
+    with IndexedJSONL(path) as data:
+        assert data.rebuilt
+        assert len(data) == len(records) == 200
+        assert data.malformed == report.malformed == 20
+        assert list(data) == records
+        assert data[-1] == {"i": 199}
+
+    with IndexedJSONL(path) as data:  # reopened from the sidecar
+        assert not data.rebuilt
+        assert data.malformed == 20
+
+
+def test_sample_and_split_never_land_on_malformed_lines(tmp_path):
+    path = write_corpus(tmp_path)
+    with IndexedJSONL(path) as data:
+        for seed in range(20):
+            assert len({record['i'] for record in data.sample(50, seed=seed)}) == 50
+        assert sorted(r['i'] for r in data.sample(len(data), seed=0)) == list(range(200))
+        train, held_out = data.split(0.1, seed=0)
+        assert len(data.take(train)) + len(data.take(held_out)) == 200
+
+
+def test_index_from_an_older_format_is_rebuilt(tmp_path):
+    path = write_corpus(tmp_path)
+    with IndexedJSONL(path) as data:
+        index_path = data.index_path
+    with open(index_path, 'r+b') as f:
+        f.write(b"JSONLIX1")
+
+    with IndexedJSONL(path) as data:
+        assert data.rebuilt
+        assert len(data) == 200
+    with open(index_path, 'rb') as f:
+        assert f.read(INDEX_HEADER.size)[:8] == b"JSONLIX2"
@@ -0,0 +1,32 @@
+"""
+Regression tests for near-duplicate shingling
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'scripts'))
+
+from near_dedup import minhash, shingles  # noqa: E402
+
+
+def test_last_word_of_a_shingle_changes_its_hash():
+    texts = [f"the kinase inhibitor binds {word}" for word in ("receptor", "enzyme", "protein")]
+    hashes = [shingles(text, 5) for text in texts]
+    assert all(len(h) == 1 for h in hashes)
+    assert len({int(h[0]) for h in hashes}) == len(texts)
+
+
+def test_final_word_variants_hash_apart():
+    hashes = {int(shingles(f"alpha beta gamma delta w{i}", 5)[0]) for i in range(5000)}
+    assert len(hashes) == 5000
+
+
+def test_short_texts_get_their_own_shingles():
+    assert not np.array_equal(shingles("hello"), shingles("world"))
+    assert not np.array_equal(shingles("lions mane"), shingles("reishi"))
+    assert not np.array_equal(shingles(""), shingles("?"))
+    assert np.array_equal(shingles("Hello!"), shingles("hello"))
+    assert not np.array_equal(minhash("hello"), minhash("world"))
@@ -0,0 +1,50 @@
+"""
+Tests for the content-addressed orbital cache
+"""
+
+import numpy as np
+
+from synapse_pharma_integration.compound_registry import default_registry
+from synapse_pharma_integration.orbital_cache import OrbitalCache
+from synapse_pharma_integration.quantum_chemistry import QuantumChemistryEngine
+
+
+def test_disk_tier_keeps_its_row_count_and_bound(tmp_path):
+    path = tmp_path / 'orbitals.sqlite'
+    cache = OrbitalCache(max_entries=2, path=str(path), max_disk_entries=5)
+    for i in range(8):
+        cache.set(f'key{i}', i)
+    cache.set('key7', 'replaced')  # an update is not a new row
+
+    stats = cache.stats()
+    assert stats['disk_entries'] == 5
+    assert stats['disk_evictions'] == 3
+    assert cache._db.execute("SELECT COUNT(*) FROM orbital_cache").fetchone()[0] == 5
+
+    reopened = OrbitalCache(path=str(path), max_disk_entries=5)
+    assert reopened.stats()['disk_entries'] == 5
+    assert reopened.get('key7') == 'replaced'
+    assert reopened.get('key0') is None
+
+    reopened.clear()
+    assert reopened.stats()['disk_entries'] == 0
+
+
+def test_derived_results_are_keyed_by_orbital_method():
+    compound = dict(default_registry().get('hericenone_a'))
+    compound['structure'] = {
+        'atoms': [{'element': 'O' if i % 5 == 0 else 'C', 'position': [1.4 * i, 0.3 * (i % 2), 0]}
+                  for i in range(40)],
+        'bonds': [{'atoms': [i, i + 1]} for i in range(39)]
+    }
+    shared = OrbitalCache()
+    for threshold in (200, 10, 200):  # dense, sparse, dense again
+        cached = QuantumChemistryEngine(sparse_threshold=threshold, cache=shared)
+        fresh = QuantumChemistryEngine(sparse_threshold=threshold)
+        got = cached.analyze_compound_structure(compound)
+        expected = fresh.analyze_compound_structure(compound)
+        assert np.isclose(got['dipole_moment'], expected['dipole_moment'])
+        assert np.isclose(got['uv_lambda_max'], expected['uv_lambda_max'])
+        # Sorted: the chain's degenerate transitions tie on wavelength
+        assert sorted(t['transition'] for t in got['electronic_transitions']) == \
+            sorted(t['transition'] for t in expected['electronic_transitions'])
@@ -0,0 +1,74 @@
+"""
+Regression tests for the sparse Hückel solver
+"""
+
+import numpy as np
+import pytest
+
+from synapse_pharma_integration.compound_registry import default_registry
+from synapse_pharma_integration.quantum_chemistry import QuantumChemistryEngine
+
+
+def fragmented_molecule(n_atoms, n_isolated, seed):
+    """π-system with broken chains, random cross-links and isolated atoms"""
+    rng = np.random.default_rng(seed)
+    core = n_atoms - n_isolated
+    bonds = [{'atoms': (i, i + 1)} for i in range(core - 1) if rng.random() > 0.05]
+    for _ in range(core // 6):
+        i, j = (int(x) for x in rng.integers(0, core, 2))
+        if i != j:
+            bonds.append({'atoms': (i, j)})
+    return {'atoms': ['C'] * n_atoms, 'bonds': bonds}
+
+
+def assert_frontier_matches_dense(molecule):
+    engine = QuantumChemistryEngine()
+    dense = engine.calculate_molecular_orbitals(molecule, method='dense')
+    sparse = engine.calculate_molecular_orbitals(molecule, method='sparse')
+    assert sparse['homo_energy'] == pytest.approx(dense['homo_energy'], abs=1e-8)
+    assert sparse['lumo_energy'] == pytest.approx(dense['lumo_energy'], abs=1e-8)
+
+
+def test_sparse_matches_dense_with_degenerate_nonbonding_orbitals():
+    # 18 isolated atoms plus the odd chain's non-bonding orbital: a 19-fold level at α
+    molecule = {
+        'atoms': ['C'] * 399,
+        'bonds': [{'atoms': (i, i + 1)} for i in range(380)]
+    }
+    assert_frontier_matches_dense(molecule)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_sparse_matches_dense_on_fragmented_molecules(seed):
+    rng = np.random.default_rng(1000 + seed)
+    n_atoms = int(rng.integers(210, 420))
+    assert_frontier_matches_dense(fragmented_molecule(n_atoms, int(rng.integers(0, 30)), seed))
+
+
+def test_compound_analysis_is_the_same_on_the_sparse_path():
+    compound = dict(default_registry().get('hericenone_a'))
+    compound['structure'] = {
+        'atoms': [{'element': 'C', 'position': [1.4 * i, 0.8 * (i % 2), 0.0]} for i in range(260)],
+        'bonds': [{'atoms': [i, i + 1]} for i in range(259)]
+    }
+    dense = QuantumChemistryEngine(sparse_threshold=1000).analyze_compound_structure(compound)
+    sparse = QuantumChemistryEngine(sparse_threshold=10).analyze_compound_structure(compound)
+
+    assert sparse.keys() == dense.keys()
+    for name in ('homo_lumo_gap', 'homo_lumo_gap_ev', 'uv_lambda_max', 'dipole_moment'):
+        assert sparse[name] == pytest.approx(dense[name], rel=1e-9), name
+    assert sparse['reactivity'] == dense['reactivity']
+    assert sparse['aromaticity'] == dense['aromaticity']
+    assert sorted(t['transition'] for t in sparse['electronic_transitions']) == \
+        sorted(t['transition'] for t in dense['electronic_transitions'])
+
+
+def test_dipole_rejects_a_frontier_window():
+    molecule = {
+        'atoms': [{'element': 'C', 'position': [1.4 * i, 0.0, 0.0]} for i in range(260)],
+        'bonds': [{'atoms': [i, i + 1]} for i in range(259)]
+    }
+    engine = QuantumChemistryEngine()
+    sparse = engine.calculate_molecular_orbitals(molecule, method='sparse')
+    with pytest.raises(ValueError):
+        engine.calculate_dipole_moment(molecule, sparse['orbital_coefficients'])
@@ -0,0 +1,73 @@
+"""
+Tests for the Ollama response cache's disk tier
+"""
+
+import asyncio
+import threading
+import time
+
+from crowelogic_ollama.cache import ResponseCache
+
+
+def disk_rows(cache):
+    return cache._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+def test_disk_count_tracks_inserts_updates_and_evictions(tmp_path):
+    cache = ResponseCache(max_entries=2, path=str(tmp_path / 'responses.sqlite'),
+                          max_disk_entries=5)
+    for i in range(8):
+        cache.set(f'key{i}', {'response': str(i)})
+    cache.set('key7', {'response': 'replaced'})  # an update is not a new row
+
+    stats = cache.stats()
+    assert stats['disk_entries'] == disk_rows(cache) == 5
+    assert stats['disk_evictions'] == 3
+
+    reopened = ResponseCache(path=str(tmp_path / 'responses.sqlite'), max_disk_entries=5)
+    assert reopened.stats()['disk_entries'] == 5
+    assert reopened.get('key7') == {'response': 'replaced'}
+    reopened.clear()
+    assert reopened.stats()['disk_entries'] == 0
+
+
+def test_expired_rows_are_purged_and_uncounted(tmp_path):
+    cache = ResponseCache(max_entries=1, path=str(tmp_path / 'responses.sqlite'),
+                          purge_interval=0.0)
+    cache.set('old', {'response': 'stale'}, ttl=0.01)
+    cache.set('evicts old from memory', {'response': 'x'})
+    time.sleep(0.02)
+    assert cache.get('old') is None
+    assert cache.stats()['expired'] == 1
+
+    cache.set('a', {'response': 'a'}, ttl=0.01)
+    time.sleep(0.02)
+    cache.set('b', {'response': 'b'})  # purges 'a'
+    assert cache.stats()['disk_entries'] == disk_rows(cache) == 2
+
+
+def test_async_disk_access_runs_off_the_event_loop(tmp_path):
+    cache = ResponseCache(max_entries=1, path=str(tmp_path / 'responses.sqlite'))
+    threads = set()
+    original_get, original_set = cache._disk_get, cache._disk_set
+
+    def disk_get(*args):
+        threads.add(threading.get_ident())
+        return original_get(*args)
+
+    def disk_set(*args):
+        threads.add(threading.get_ident())
+        return original_set(*args)
+
+    cache._disk_get, cache._disk_set = disk_get, disk_set
+
+    async def run():
+        await cache.aset('a', {'response': 'a'})
+        await cache.aset('b', {'response': 'b'})  # 'a' leaves the memory tier
+        return await cache.aget('a'), await cache.aget('b'), await cache.aget('missing')
+
+    assert asyncio.run(run()) == ({'response': 'a'}, {'response': 'b'}, None)
+    assert threads and threading.get_ident() not in threads
+    stats = cache.stats()
+    # Each disk hit is promoted to memory and pushes the other key out
+    assert (stats['memory_hits'], stats['disk_hits'], stats['misses']) == (0, 2, 1)
@@ -0,0 +1,61 @@
+"""
+Tests for request coalescing
+"""
+
+import asyncio
+
+import pytest
+
+from crowelogic_ollama.singleflight import SingleFlight
+
+
+def test_work_survives_the_leader_while_a_follower_waits():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == ("result", True)
+        assert calls == [1]
+
+    asyncio.run(run())
+
+
+def test_work_is_cancelled_when_every_waiter_has_gone():
+    async def run():
+        flight = SingleFlight()
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        for waiter in waiters:
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flight.in_flight() == 0
+
+        async def fresh():
+            return "again"
+
+        assert await flight.do("key", fresh) == ("again", False)
+
+    asyncio.run(run())